@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+ORG_VERSION_KEY = "user-org-version"
+
+
+def get_org_version() -> int:
+    """Текущая версия закэшированных отделов и компаний пользователей"""
+    return cache.get_or_set(ORG_VERSION_KEY, 1, None)
+
+
+def get_org_cache_key(user_id) -> str:
+    """Ключ кэша с отделом и компанией пользователя"""
+    return f"user-org:{user_id}:{get_org_version()}"
+
+
+def invalidate_user_org():
+    """Делает недействительными закэшированные отделы и компании всех пользователей"""
+    try:
+        cache.incr(ORG_VERSION_KEY)
+    except ValueError:
+        cache.set(ORG_VERSION_KEY, 1, None)
+
+
+class CachedOrgBackend(ModelBackend):
+    """Backend аутентификации, загружающий пользователя вместе с отделом и компанией"""
+
+    def get_user(self, user_id):
+        key = get_org_cache_key(user_id)
+        org = cache.get(key)
+        users = get_user_model()._default_manager
+        if org is None:
+            users = users.select_related("department__company")
+        try:
+            user = users.get(pk=user_id)
+        except users.model.DoesNotExist:
+            return None
+        if org is None:
+            cache.set(key, (user.department_id, user.department), settings.USER_ORG_CACHE_TIMEOUT)
+        elif org[0] == user.department_id:
+            user.department = org[1]
+        return user if self.user_can_authenticate(user) else None
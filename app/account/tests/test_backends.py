@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from account.backends import CachedOrgBackend, invalidate_user_org
+from user.models import User, Company, Department
+
+
+class CachedOrgBackendTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='company1')
+        cls.department = Department.objects.create(name='department1', company=cls.company)
+        cls.user = User.objects.create_user(first_name='John', last_name='Connor', email='JohnConnor@email.com',
+                                            department=cls.department, post='leader', role=3, password='12345678')
+        cls.admin = User.objects.create_user(first_name='admin', last_name='admin', email='admin@email.com',
+                                             department=cls.department, post='admin', role=1, password='12345678')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_loads_department_and_company_with_user(self):
+        with self.assertNumQueries(1):
+            user = CachedOrgBackend().get_user(self.user.id)
+            self.assertEqual(user.department.company.name, 'company1')
+        with self.assertNumQueries(1):
+            user = CachedOrgBackend().get_user(self.user.id)
+            self.assertEqual(user.department.company.name, 'company1')
+
+    def test_ignores_cached_department_of_moved_user(self):
+        CachedOrgBackend().get_user(self.user.id)
+        other = Department.objects.create(name='department2', company=self.company)
+        User.objects.filter(id=self.user.id).update(department=other)
+        self.assertEqual(CachedOrgBackend().get_user(self.user.id).department.name, 'department2')
+
+    def test_invalidation(self):
+        CachedOrgBackend().get_user(self.user.id)
+        Company.objects.filter(id=self.company.id).update(name='company2')
+        self.assertEqual(CachedOrgBackend().get_user(self.user.id).department.company.name, 'company1')
+        invalidate_user_org()
+        self.assertEqual(CachedOrgBackend().get_user(self.user.id).department.company.name, 'company2')
+
+    def test_edit_company_invalidates_cache(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('user-page'))
+        self.client.force_login(self.admin)
+        self.client.post(reverse('edit-company', args=[self.company.id]), data={'name': 'company2'})
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('user-page')), 'Company: company2')
+
+    def test_keeps_sessions_of_model_backend(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        resp = self.client.get(reverse('user-page'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context['user'], self.user)
+
+    def test_inactive_user(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertIsNone(CachedOrgBackend().get_user(self.user.id))
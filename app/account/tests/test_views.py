@@ -106,4 +106,16 @@ class ViewsTestCase(TestCase):
         })
         self.assertEqual(str(User.objects.get(email="ads@mail.ru")), "abc abc")
         self.assertEqual(resp.status_code, 302)
-        self.assertEqual(resp.url, "/accounts/login")
\ No newline at end of file
+        self.assertEqual(resp.url, "/accounts/login")
+
+    def test_3_post_request_registration_view_expired_code(self):
+        UnregisteredUser.objects.create(code="54321", first_name="abc", last_name="abc", email="old@mail.ru",
+                                        post="ads", department=self.department,
+                                        created_at=timezone.now() - timezone.timedelta(days=30))
+        resp = self.client.post(reverse("registration"), data={
+            "code": ["54321"],
+            "password": ["12345678"],
+            "password2": ["12345678"]
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(User.objects.filter(email="old@mail.ru").exists())
@@ -50,7 +50,8 @@ def registration(request):
             code = form.cleaned_data["code"]
 
             try:
-                unreg_user = UnregisteredUser.objects.get(code=code)
+                unreg_user = UnregisteredUser.objects.get(
+                    code=code, created_at__gte=UnregisteredUser.get_expiry_time())
             except ObjectDoesNotExist:
                 messages.error(request, "invalid access key")
                 return render(request, "base_form.html", context={
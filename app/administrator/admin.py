@@ -1,4 +1,5 @@
 from django.contrib import admin
 
-from .models import UnregisteredUser
+from .models import UnregisteredUser, OutboxEmail
 admin.site.register(UnregisteredUser)
+admin.site.register(OutboxEmail)
@@ -1,7 +1,8 @@
 from django import forms
+from django.db.models import Q
 
 from administrator.models import UnregisteredUser
-from user.models import User, Company
+from user.models import User, Company, Department
 
 
 class InvitationForm(forms.ModelForm):
@@ -12,7 +13,46 @@ class InvitationForm(forms.ModelForm):
         fields = ['first_name', 'last_name', 'email', 'department', 'post']
 
 
+class InvitationRowForm(forms.Form):
+    first_name = forms.CharField(max_length=150)
+    last_name = forms.CharField(max_length=150)
+    email = forms.EmailField(max_length=254)
+    post = forms.CharField(max_length=200)
+    role = forms.TypedChoiceField(choices=(('1', 'admin'), ('2', 'director'), ('3', 'user')), coerce=int,
+                                  required=False, empty_value=3)
+
+
+class BulkInvitationForm(forms.Form):
+    department = forms.ModelChoiceField(queryset=Department.objects.all())
+    file = forms.FileField(label='File (.csv or .xlsx) with columns first_name, last_name, email, post, role')
+
+
 class ChangeUserForm(forms.ModelForm):
     class Meta:
         model = User
         fields = ['department', 'is_active']
+
+
+class UserFilterForm(forms.Form):
+    company = forms.ModelChoiceField(queryset=Company.objects.all(), required=False)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False)
+    role = forms.ChoiceField(choices=(('', 'any'), (2, 'director'), (3, 'user')), required=False)
+    blocked = forms.ChoiceField(choices=(('', 'any'), ('1', 'blocked'), ('0', 'active')), required=False)
+    # поиск по префиксу с учетом регистра, чтобы использовались индексы varchar_pattern_ops
+    search = forms.CharField(label='Name or email starts with (case-sensitive)', max_length=150, required=False)
+
+    def filter(self, users):
+        """Применяет условия формы к queryset пользователей"""
+        data = self.cleaned_data
+        if data['company']:
+            users = users.filter(department__company=data['company'])
+        if data['department']:
+            users = users.filter(department=data['department'])
+        if data['role']:
+            users = users.filter(role=data['role'])
+        if data['blocked']:
+            users = users.filter(is_active=data['blocked'] == '0')
+        if data['search']:
+            users = users.filter(Q(last_name__startswith=data['search']) | Q(first_name__startswith=data['search'])
+                                 | Q(email__startswith=data['search']))
+        return users
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from administrator.models import UnregisteredUser
+
+
+def purge_expired_invitations(batch_size: int) -> int:
+    """Удаляет просроченные приглашения пакетами по batch_size; возвращает количество удаленных"""
+    deleted = 0
+    while True:
+        ids = list(UnregisteredUser.get_expired().order_by("created_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += UnregisteredUser.objects.filter(id__in=ids).delete()[0]
+
+
+class Command(BaseCommand):
+    """Удаляет приглашения, срок действия которых истек"""
+    help = "Deletes expired invitations in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.INVITATION_PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_invitations(options["batch_size"])
+        self.stdout.write(f"Deleted {deleted} expired invitations")
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from administrator.models import OutboxEmail
+from main.prometheus import invitation_emails_total
+
+
+def claim_outbox_batch(batch_size: int, lease_until) -> list:
+    """Забирает пакет писем, срок отправки которых наступил, откладывая их следующую попытку до lease_until,
+    чтобы другие отправители не взяли их, пока идет отправка"""
+    with transaction.atomic():
+        emails = list(OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OutboxEmail.PENDING, next_attempt_at__lte=timezone.now()).order_by("next_attempt_at", "id")[
+                :batch_size])
+        OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(next_attempt_at=lease_until)
+    return emails
+
+
+def send_outbox_batch(connection, batch_size: int) -> int:
+    """Отправляет пакет писем вне транзакции, сохраняя результат каждого письма отдельным запросом;
+    возвращает количество забранных писем"""
+    lease_until = timezone.now() + timedelta(seconds=settings.OUTBOX_LEASE)
+    emails = claim_outbox_batch(batch_size, lease_until)
+    for email in emails:
+        if timezone.now() + timedelta(seconds=settings.EMAIL_TIMEOUT or 0) >= lease_until:
+            break
+        try:
+            connection.open()
+            email.get_message(connection).send()
+        except Exception as error:
+            email.attempts += 1
+            email.last_error = str(error)
+            if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                email.status = OutboxEmail.FAILED
+            else:
+                email.next_attempt_at = timezone.now() + timedelta(
+                    seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1))
+            connection.close()
+            invitation_emails_total.labels("failed").inc()
+        else:
+            email.status, email.sent_at = OutboxEmail.SENT, timezone.now()
+            invitation_emails_total.labels("sent").inc()
+        OutboxEmail.objects.filter(id=email.id).update(
+            status=email.status, sent_at=email.sent_at, attempts=email.attempts, last_error=email.last_error,
+            next_attempt_at=email.next_attempt_at)
+    return len(emails)
+
+
+class Command(BaseCommand):
+    """Отправляет письма из очереди пакетами через одно постоянное соединение"""
+    help = "Delivers queued outbox emails in batches with retries and exponential backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="send due emails and exit")
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=settings.OUTBOX_SENDER_INTERVAL,
+                            help="seconds between polls")
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                processed = send_outbox_batch(connection, options["batch_size"])
+                if processed:
+                    self.stdout.write(f"Processed {processed} emails")
+                if processed < options["batch_size"]:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        finally:
+            connection.close()
@@ -1,6 +1,10 @@
+from datetime import timedelta
 from string import ascii_letters, digits
 from secrets import choice
-from django.db import models
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from user.models import Department
 
 
@@ -11,12 +15,93 @@ class UnregisteredUser(models.Model):
     department = models.ForeignKey(Department, on_delete=models.RESTRICT)
     post = models.CharField(max_length=200)
     role = models.SmallIntegerField(default=3)
-    code = models.CharField(max_length=8)
+    code = models.CharField(max_length=8, unique=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    CODE_ATTEMPTS = 10
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
 
-    def generate_code(self):
+    @staticmethod
+    def generate_code():
         letters_and_digits = ascii_letters + digits
         code = ''.join(choice(letters_and_digits) for i in range(8))
         return code
+
+    def save_with_new_code(self):
+        """Сохраняет приглашение с новым кодом доступа, повторяя вставку при совпадении кода"""
+        for attempt in range(self.CODE_ATTEMPTS):
+            self.code = self.generate_code()
+            try:
+                with transaction.atomic():
+                    self.save(force_insert=True)
+                return
+            except IntegrityError:
+                if attempt == self.CODE_ATTEMPTS - 1 or not UnregisteredUser.objects.filter(code=self.code).exists():
+                    raise
+
+    @staticmethod
+    def get_expiry_time():
+        """Момент времени, раньше которого созданные приглашения считаются просроченными"""
+        return timezone.now() - timedelta(seconds=settings.INVITATION_LIFETIME)
+
+    @classmethod
+    def get_expired(cls):
+        """Приглашения, срок действия которых истек"""
+        return cls.objects.filter(created_at__lt=cls.get_expiry_time())
+
+    def get_invitation_message(self) -> tuple:
+        """Письмо с приглашением на регистрацию в формате (тема, текст, отправитель, [получатель])"""
+        return ('Регистрация',
+                f'Уважаемый {self.first_name} {self.last_name}, приглашаем вас пройти регистрацию в приложении'
+                f' “Система учета рабочего времени сотрудников”.\nДля регистрации перейдите по ссылке '
+                f'http://127.0.0.1:8000/accounts/registration/\n'
+                f'Код доступа: {self.code}',
+                settings.EMAIL_HOST_USER,
+                [self.email])
+
+
+class OutboxEmailManager(models.Manager):
+    """Manager, ставящий письма в очередь на отправку"""
+
+    def enqueue(self, subject, message, from_email, recipient_list):
+        """Ставит письмо в очередь; аргументы такие же, как у send_mail"""
+        return self.create(subject=subject, body=message, from_email=from_email, to="\n".join(recipient_list))
+
+    def enqueue_many(self, datatuple):
+        """Ставит письма в очередь одним запросом; аргумент такой же, как у send_mass_mail"""
+        return self.bulk_create([self.model(subject=subject, body=message, from_email=from_email,
+                                            to="\n".join(recipient_list))
+                                 for subject, message, from_email, recipient_list in datatuple])
+
+
+class OutboxEmail(models.Model):
+    """Модель, описывающая таблицу исходящих писем"""
+    PENDING, SENT, FAILED = 1, 2, 3
+    STATUSES = ((PENDING, 'pending'), (SENT, 'sent'), (FAILED, 'failed'))
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField()
+    status = models.SmallIntegerField(choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+
+    objects = OutboxEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to}'
+
+    def get_message(self, connection=None) -> EmailMessage:
+        """Письмо для отправки через соединение connection"""
+        return EmailMessage(self.subject, self.body, self.from_email, self.to.split("\n"), connection=connection)
@@ -0,0 +1,110 @@
+import csv
+import io
+import zipfile
+from django.db import IntegrityError, transaction
+from administrator.models import UnregisteredUser
+from administrator.forms import InvitationRowForm
+from user.models import User
+
+invitation_columns = ["first_name", "last_name", "email", "post", "role"]
+
+
+def read_xlsx_rows(file) -> list:
+    """Читает строки из первого листа xlsx файла; поврежденный файл приводит к ValueError"""
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        worksheet = load_workbook(file, read_only=True).active
+        lines = worksheet.iter_rows(values_only=True)
+        header = [str(cell or "").strip().lower() for cell in next(lines, [])]
+        return [{name: "" if value is None else str(value).strip() for name, value in zip(header, line)}
+                for line in lines if any(value is not None for value in line)]
+    except (zipfile.BadZipFile, KeyError, InvalidFileException) as error:
+        raise ValueError(f"the file is not a valid .xlsx workbook: {error}") from error
+
+
+def read_csv_rows(file) -> list:
+    """Читает строки из csv файла с разделителем , или ; (если его не удается определить - как excel csv)"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        reader = csv.DictReader(text, dialect=dialect)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        return [{name: (value or "").strip() for name, value in row.items() if name} for row in reader]
+    except csv.Error as error:
+        raise ValueError(f"the file is not a valid .csv file: {error}") from error
+
+
+def read_invitation_rows(file) -> list:
+    """Читает строки приглашений из загруженного csv или xlsx файла"""
+    if file.name.lower().endswith(".xlsx"):
+        rows = read_xlsx_rows(file)
+    elif file.name.lower().endswith(".csv"):
+        rows = read_csv_rows(file)
+    else:
+        raise ValueError("the file must be .csv or .xlsx")
+    if rows and not set(invitation_columns[:4]) <= set(rows[0]):
+        raise ValueError(f"the file must have columns {', '.join(invitation_columns)}")
+    return rows
+
+
+def generate_codes(count: int) -> list:
+    """Генерирует count различных кодов доступа; совпадения с базой отсекает уникальный индекс при вставке"""
+    codes = set()
+    while len(codes) < count:
+        codes.add(UnregisteredUser.generate_code())
+    return list(codes)
+
+
+def create_invitations(invitations: list) -> list:
+    """Вставляет приглашения одним запросом, заменяя коды, совпавшие с уже выданными, и повторяя вставку"""
+    for attempt in range(UnregisteredUser.CODE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return UnregisteredUser.objects.bulk_create(invitations)
+        except IntegrityError:
+            taken = set(UnregisteredUser.objects.filter(code__in=[invitation.code for invitation in invitations])
+                        .values_list("code", flat=True))
+            if attempt == UnregisteredUser.CODE_ATTEMPTS - 1 or not taken:
+                raise
+            used = {invitation.code for invitation in invitations}
+            for invitation in invitations:
+                if invitation.code in taken:
+                    while invitation.code in used:
+                        invitation.code = UnregisteredUser.generate_code()
+                    used.add(invitation.code)
+
+
+def import_invitations(rows: list, department) -> tuple:
+    """Проверяет все строки и создает приглашения одним запросом; возвращает (приглашения, ошибки)"""
+    errors, cleaned, emails, seen = [], [], set(), set()
+    for number, row in enumerate(rows, start=2):
+        form = InvitationRowForm(row)
+        if not form.is_valid():
+            errors.extend(f"row {number}: {field} - {' '.join(messages)}" for field, messages in form.errors.items())
+            continue
+        email = form.cleaned_data["email"]
+        if email.lower() in seen:
+            errors.append(f"row {number}: email {email} is repeated in the file")
+            continue
+        emails.add(email)
+        seen.add(email.lower())
+        cleaned.append((number, form.cleaned_data))
+
+    taken = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+    taken |= set(UnregisteredUser.objects.filter(email__in=emails).values_list("email", flat=True))
+    for number, data in cleaned:
+        if data["email"] in taken:
+            errors.append(f"row {number}: email {data['email']} is already registered or invited")
+    if errors:
+        return [], errors
+
+    invitations = [UnregisteredUser(department=department, code=code, **data)
+                   for (number, data), code in zip(cleaned, generate_codes(len(cleaned)))]
+    return create_invitations(invitations), []
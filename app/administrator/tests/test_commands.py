@@ -0,0 +1,85 @@
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from prometheus_client import REGISTRY
+
+from administrator.management.commands.send_outbox_emails import send_outbox_batch
+from administrator.models import OutboxEmail, UnregisteredUser
+from user.models import Company, Department
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("smtp is unreachable")
+
+
+class ConcurrentSenderEmailBackend(EmailBackend):
+    claimed_by_other_sender = []
+
+    def send_messages(self, messages):
+        self.claimed_by_other_sender.append(send_outbox_batch(EmailBackend(), 100))
+        return super().send_messages(messages)
+
+
+class SendOutboxEmailsCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        OutboxEmail.objects.enqueue_many([('Регистрация', f'Код доступа: {i}', 'admin@email.com',
+                                           [f'user{i}@email.com']) for i in range(5)])
+
+    def test_sends_due_emails(self):
+        sent = REGISTRY.get_sample_value('app_invitation_emails_total', {'result': 'sent'}) or 0
+        call_command('send_outbox_emails', once=True, batch_size=2, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(REGISTRY.get_sample_value('app_invitation_emails_total', {'result': 'sent'}), sent + 5)
+        self.assertEqual(mail.outbox[0].to, ['user0@email.com'])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 5)
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='administrator.tests.test_commands.FailingEmailBackend', OUTBOX_MAX_ATTEMPTS=2)
+    def test_retries_with_backoff(self):
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        email = OutboxEmail.objects.order_by('id').first()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 1))
+        self.assertEqual(email.last_error, 'smtp is unreachable')
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.FAILED, attempts=2).count(), 5)
+
+    @override_settings(EMAIL_BACKEND='administrator.tests.test_commands.ConcurrentSenderEmailBackend')
+    def test_claimed_emails_are_leased_to_one_sender(self):
+        ConcurrentSenderEmailBackend.claimed_by_other_sender.clear()
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        self.assertEqual(ConcurrentSenderEmailBackend.claimed_by_other_sender, [0] * 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_TIMEOUT=10, OUTBOX_LEASE=5)
+    def test_stops_when_lease_does_not_cover_a_send(self):
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.PENDING, attempts=0,
+                                                    next_attempt_at__gt=timezone.now()).count(), 5)
+
+
+class PurgeInvitationsCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(name='company1')
+        department = Department.objects.create(name='department1', company=company)
+        for i in range(5):
+            UnregisteredUser.objects.create(first_name='John', last_name='Connor', email=f'user{i}@email.com',
+                                            department=department, post='soldier', code=f'code{i}',
+                                            created_at=timezone.now() - timedelta(days=30 if i < 3 else 1))
+
+    def test_deletes_only_expired_invitations(self):
+        out = StringIO()
+        call_command('purge_invitations', batch_size=2, stdout=out)
+        self.assertIn('Deleted 3', out.getvalue())
+        self.assertEqual(sorted(UnregisteredUser.objects.values_list('code', flat=True)), ['code3', 'code4'])
@@ -1,4 +1,6 @@
 from django.test import TestCase
+from django.db import IntegrityError
+from unittest import mock
 
 from administrator.models import UnregisteredUser
 from user.models import Company, Department
@@ -88,3 +90,18 @@ class UnregisteredUserModelTest(TestCase):
         user = UnregisteredUser.objects.get(id=1)
         code = user.generate_code()
         self.assertTrue(type(code) == str and len(code) == 8)
+
+    def test_code_is_unique(self):
+        user = UnregisteredUser.objects.get(id=1)
+        self.assertTrue(user._meta.get_field('code').unique)
+        with self.assertRaises(IntegrityError):
+            UnregisteredUser.objects.create(first_name='Kyle', last_name='Reese', email='kyle@email.com',
+                                            department=user.department, post='soldier', code=user.code)
+
+    def test_save_with_new_code_retries_on_collision(self):
+        department = UnregisteredUser.objects.get(id=1).department
+        user = UnregisteredUser(first_name='Sarah', last_name='Connor', email='sarah@email.com',
+                                department=department, post='mother')
+        with mock.patch.object(UnregisteredUser, 'generate_code', side_effect=['12345678', 'abcdefgh']):
+            user.save_with_new_code()
+        self.assertEqual(UnregisteredUser.objects.get(email='sarah@email.com').code, 'abcdefgh')
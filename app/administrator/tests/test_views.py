@@ -1,7 +1,16 @@
 from django.test import TestCase
 from django.urls import reverse
+from django.core import mail
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from io import BytesIO, StringIO
+import tempfile
+from unittest import mock
+from openpyxl import Workbook
 
 from user.models import User, Company, Department
+from administrator.models import UnregisteredUser, OutboxEmail
+from main.metrics import reset
 
 
 def create_company_and_users():
@@ -191,6 +200,23 @@ class InviteUserViewTest(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, 'administrator/invitation.html')
 
+    def test_post_request_queues_invitation_email(self):
+        self.client.force_login(self.admin)
+        resp = self.client.post(reverse('invitation'), data={
+            'first_name': 'Kyle',
+            'last_name': 'Reese',
+            'email': 'kyle@email.com',
+            'department': self.department.id,
+            'post': 'soldier',
+            'role': 3
+        })
+        self.assertRedirects(resp, reverse('administrator-page'))
+        user = UnregisteredUser.objects.get(email='kyle@email.com')
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, 'kyle@email.com')
+        self.assertIn(user.code, email.body)
+        self.assertEqual(len(mail.outbox), 0)
+
     def test_redirect_not_logged_in(self):
         resp = self.client.get(reverse('invitation'))
         self.assertRedirects(resp, '/accounts/login/?next=/administrator/invitation/')
@@ -200,3 +226,205 @@ class InviteUserViewTest(TestCase):
         resp = self.client.get(reverse('invitation'))
         self.assertEqual(resp.status_code, 302)
         self.assertEqual(resp.url, '/accounts/login')
+
+
+class AdminIndexFilterViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, cls.department, cls.admin, cls.not_admin = create_company_and_users()
+        other_company = Company.objects.create(name='company2')
+        cls.other_department = Department.objects.create(name='department2', company=other_company)
+        for i in range(5):
+            User.objects.create_user(first_name='Sarah', last_name=f'Connor{i}', email=f'sarah{i}@email.com',
+                                     department=cls.other_department, post='user', role=2, password='12345678',
+                                     is_active=i % 2 == 0)
+
+    def test_filters_users(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse('administrator-page'), {'company': self.other_department.company.id})
+        self.assertEqual(len(resp.context['users']), 5)
+        resp = self.client.get(reverse('administrator-page'), {'department': self.department.id, 'role': 3})
+        self.assertEqual(len(resp.context['users']), 2)
+        resp = self.client.get(reverse('administrator-page'), {'blocked': '1'})
+        self.assertEqual(len(resp.context['users']), 2)
+        resp = self.client.get(reverse('administrator-page'), {'search': 'sarah1'})
+        self.assertEqual([user.email for user in resp.context['users']], ['sarah1@email.com'])
+
+    def test_pages_users(self):
+        self.client.force_login(self.admin)
+        with self.settings(PAGE_SIZE=4):
+            resp = self.client.get(reverse('administrator-page'))
+            first_page = [user.id for user in resp.context['users']]
+            self.assertEqual(len(first_page), 4)
+            self.assertTrue(resp.context['page'].has_next)
+            resp = self.client.get(reverse('administrator-page'), {'after': resp.context['page'].next_cursor})
+            second_page = [user.id for user in resp.context['users']]
+            self.assertEqual(len(second_page), 3)
+            self.assertFalse(set(first_page) & set(second_page))
+
+    def test_number_of_queries_does_not_depend_on_users(self):
+        self.client.force_login(self.admin)
+        with self.assertNumQueries(5):
+            self.client.get(reverse('administrator-page'))
+
+
+class InviteUsersViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, cls.department, cls.admin, cls.not_admin = create_company_and_users()
+
+    def upload(self, name, content):
+        return self.client.post(reverse('bulk-invitation'), data={
+            'department': self.department.id,
+            'file': SimpleUploadedFile(name, content),
+        })
+
+    def test_use_correct_template(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse('bulk-invitation'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, 'administrator/bulk_invitation.html')
+
+    def test_invites_users_from_csv(self):
+        self.client.force_login(self.admin)
+        rows = ''.join(f'Kyle{i};Reese{i};kyle{i}@email.com;soldier;3\n' for i in range(20))
+        with self.assertNumQueries(11):
+            resp = self.upload('users.csv', f'first_name;last_name;email;post;role\n{rows}'.encode())
+        self.assertRedirects(resp, reverse('administrator-page'))
+        invitations = UnregisteredUser.objects.filter(email__startswith='kyle')
+        self.assertEqual(invitations.count(), 20)
+        self.assertEqual(len(set(invitations.values_list('code', flat=True))), 20)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.count(), 20)
+        call_command('send_outbox_emails', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 20)
+        self.assertEqual(mail.outbox[0].to, ['kyle0@email.com'])
+
+    def test_invites_users_from_xlsx(self):
+        self.client.force_login(self.admin)
+        workbook = Workbook()
+        workbook.active.append(['first_name', 'last_name', 'email', 'post', 'role'])
+        workbook.active.append(['Kyle', 'Reese', 'kyle@email.com', 'soldier', 2])
+        file = BytesIO()
+        workbook.save(file)
+        resp = self.upload('users.xlsx', file.getvalue())
+        self.assertRedirects(resp, reverse('administrator-page'))
+        self.assertEqual(UnregisteredUser.objects.get(email='kyle@email.com').role, 2)
+
+    def test_replaces_codes_colliding_with_existing_invitations(self):
+        self.client.force_login(self.admin)
+        UnregisteredUser.objects.create(first_name='T', last_name='800', email='t800@email.com',
+                                        department=self.department, post='robot', code='taken001')
+        with mock.patch('administrator.supporting.generate_codes', return_value=['taken001', 'unique01']):
+            resp = self.upload('users.csv', b'first_name,last_name,email,post,role\n'
+                                            b'Kyle,Reese,kyle@email.com,soldier,3\n'
+                                            b'Sarah,Connor,sarah@email.com,mother,3\n')
+        self.assertRedirects(resp, reverse('administrator-page'))
+        codes = set(UnregisteredUser.objects.values_list('code', flat=True))
+        self.assertEqual(len(codes), UnregisteredUser.objects.count())
+        self.assertIn('unique01', codes)
+
+    def test_rejects_whole_file_with_invalid_rows(self):
+        self.client.force_login(self.admin)
+        resp = self.upload('users.csv', b'first_name,last_name,email,post,role\n'
+                                        b'Kyle,Reese,kyle@email.com,soldier,3\n'
+                                        b'Kyle,Reese,KYLE@email.com,soldier,3\n'
+                                        b'John,Connor,JohnConnor@email.com,leader,3\n'
+                                        b'T,800,not an email,robot,3\n')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context['errors']), 3)
+        self.assertFalse(UnregisteredUser.objects.filter(email='kyle@email.com').exists())
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_rejects_unreadable_files(self):
+        self.client.force_login(self.admin)
+        for name, content, error in [
+            ('users.csv', b'first_name\tlast_name\temail\tpost\trole\nKyle\tReese\tkyle@email.com\tsoldier\t3\n',
+             'the file must have columns'),
+            ('users.csv', b'email\nkyle@email.com\n', 'the file must have columns'),
+            ('users.xlsx', b'not a workbook', 'not a valid .xlsx'),
+        ]:
+            resp = self.upload(name, content)
+            self.assertEqual(resp.status_code, 200)
+            [message] = resp.context['errors']
+            self.assertIn(error, message)
+        self.assertFalse(UnregisteredUser.objects.exists())
+
+    def test_redirect_not_admin(self):
+        self.client.force_login(self.not_admin)
+        resp = self.client.get(reverse('bulk-invitation'))
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, '/accounts/login')
+
+
+class MetricsViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, department, cls.admin, cls.not_admin = create_company_and_users()
+
+    def setUp(self):
+        reset()
+
+    def test_shows_measured_views(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse('administrator-page'))
+        resp = self.client.get(reverse('administrator-metrics'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, 'administrator/metrics.html')
+        [row] = resp.context['rows']
+        self.assertEqual(row['view'], 'administrator-page')
+        self.assertEqual(row['count'], 1)
+        self.assertGreater(row['queries'][0], 0)
+
+    def test_redirect_not_admin(self):
+        self.client.force_login(self.not_admin)
+        resp = self.client.get(reverse('administrator-metrics'))
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, '/accounts/login')
+
+
+class SlowQueriesViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, department, cls.admin, cls.not_admin = create_company_and_users()
+
+    def test_shows_captured_queries(self):
+        self.client.force_login(self.admin)
+        with self.settings(SLOW_QUERY_THRESHOLD=0), self.assertLogs('slow_queries', 'WARNING'):
+            self.client.get(reverse('administrator-page'))
+        resp = self.client.get(reverse('slow-queries'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, 'administrator/slow_queries.html')
+        self.assertEqual(resp.context['queries'][0]['view'], 'administrator-page')
+
+    def test_redirect_not_admin(self):
+        self.client.force_login(self.not_admin)
+        resp = self.client.get(reverse('slow-queries'))
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, '/accounts/login')
+
+
+class ProfilesViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, department, cls.admin, cls.not_admin = create_company_and_users()
+
+    def test_lists_shows_and_downloads_profiles(self):
+        self.client.force_login(self.admin)
+        with tempfile.TemporaryDirectory() as directory, self.settings(PROFILES_DIR=directory):
+            name = self.client.get(reverse('administrator-page'), HTTP_X_PROFILE='1')['X-Profile-ID']
+            resp = self.client.get(reverse('profiles'))
+            self.assertEqual(resp.context['profiles'], [name])
+            resp = self.client.get(reverse('profile', args=[name]))
+            self.assertContains(resp, 'view: administrator-page')
+            resp = self.client.get(reverse('download-profile', args=[name]))
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.has_header('Content-Disposition'))
+            resp.close()
+            self.assertEqual(self.client.get(reverse('profile', args=['..'])).status_code, 404)
+
+    def test_redirect_not_admin(self):
+        self.client.force_login(self.not_admin)
+        resp = self.client.get(reverse('profiles'))
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, '/accounts/login')
@@ -5,5 +5,11 @@ urlpatterns = [
     path('user/<id>/', views.change_user, name='user'),
     path('delete-user/<id>/', views.delete_user, name='delete-user'),
     path('invitation/', views.invite_user, name='invitation'),
+    path('bulk-invitation/', views.invite_users, name='bulk-invitation'),
+    path('metrics/', views.metrics, name='administrator-metrics'),
+    path('slow-queries/', views.slow_queries, name='slow-queries'),
+    path('profiles/', views.profiles, name='profiles'),
+    path('profiles/<name>/', views.profile, name='profile'),
+    path('profiles/<name>/download/', views.download_profile, name='download-profile'),
     path('', views.index, name='administrator-page'),
 ]
\ No newline at end of file
@@ -1,13 +1,20 @@
+from datetime import datetime, timezone
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.http import Http404, FileResponse
 from user.models import User
-from administrator.models import UnregisteredUser
-from administrator.forms import InvitationForm, ChangeUserForm
+from administrator.models import UnregisteredUser, OutboxEmail
+from administrator.forms import InvitationForm, ChangeUserForm, UserFilterForm, BulkInvitationForm
+from administrator.supporting import read_invitation_rows, import_invitations
 from main.views import decorator_adds_user_information_log
+from account.backends import invalidate_user_org
+from main.pagination import get_keyset_page, get_carried_fields
+from main.metrics import get_summary, PERCENTILES, started_at
+from main.slow_queries import get_slow_queries
+from main.profiling import get_profile_names, get_profile_path
 
 
 def decorator_check_admin(func):
@@ -25,8 +32,18 @@ def decorator_check_admin(func):
 @decorator_check_admin
 def index(request):
     """Главная страница админа"""
-    users = User.objects.exclude(role=1)
-    return render(request, "administrator/index.html", context={'users': users})
+    users = User.objects.filter(role__in=[2, 3]).select_related('department__company')
+    form = UserFilterForm(request.GET)
+    if form.is_valid():
+        users = form.filter(users)
+    page = get_keyset_page(users, ("last_name", "first_name", "id"), after=request.GET.get("after"),
+                           before=request.GET.get("before"))
+    return render(request, "administrator/index.html", context={
+        'users': page,
+        'page': page,
+        'page_fields': get_carried_fields(request.GET),
+        'filter_form': form,
+    })
 
 
 @login_required
@@ -44,6 +61,7 @@ def change_user(request, id):
             user.department = form.cleaned_data["department"]
             user.is_active = form.cleaned_data["is_active"]
             user.save()
+            invalidate_user_org()
             return redirect("/administrator/")
     else:
         form = ChangeUserForm(instance=user)
@@ -81,22 +99,96 @@ def invite_user(request):
                 user.department = form.cleaned_data["department"]
                 user.post = form.cleaned_data["post"]
                 user.role = form.cleaned_data["role"]
-                while True:
-                    code = user.generate_code()
-                    if not UnregisteredUser.objects.filter(code=code):
-                        user.code = code
-                        break
-                user.save()
-                send_mail('Регистрация',
-                          f'Уважаемый {user.first_name} {user.last_name}, приглашаем вас пройти регистрацию в приложении'
-                          f' “Система учета рабочего времени сотрудников”.\nДля регистрации перейдите по ссылке '
-                          f'http://127.0.0.1:8000/accounts/registration/\n'
-                          f'Код доступа: {user.code}',
-                          settings.EMAIL_HOST_USER,
-                          [user.email])
+                with transaction.atomic():
+                    user.save_with_new_code()
+                    OutboxEmail.objects.enqueue(*user.get_invitation_message())
                 return redirect(index)
             else:
                 messages.error(request, "Invalid data")
     else:
         form = InvitationForm()
     return render(request, "administrator/invitation.html", context={"form": form})
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def invite_users(request):
+    """Приглашение пользователей на регистрацию списком из csv или xlsx файла"""
+    errors = []
+    if request.method == "POST":
+        form = BulkInvitationForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                rows = read_invitation_rows(form.cleaned_data["file"])
+            except ValueError as error:
+                rows, errors = [], [str(error)]
+            if rows:
+                with transaction.atomic():
+                    invitations, errors = import_invitations(rows, form.cleaned_data["department"])
+                    OutboxEmail.objects.enqueue_many([invitation.get_invitation_message()
+                                                      for invitation in invitations])
+                if not errors:
+                    messages.success(request, f"{len(invitations)} invitations sent")
+                    return redirect(index)
+            elif not errors:
+                errors = ["the file has no rows"]
+        else:
+            messages.error(request, "Invalid data")
+    else:
+        form = BulkInvitationForm()
+    return render(request, "administrator/bulk_invitation.html", context={"form": form, "errors": errors})
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def metrics(request):
+    """Перцентили времени ответа, времени БД и числа запросов по представлениям с момента запуска процесса"""
+    return render(request, "administrator/metrics.html", context={
+        "rows": get_summary(),
+        "percentiles": PERCENTILES,
+        "started_at": datetime.fromtimestamp(started_at, timezone.utc),
+    })
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def slow_queries(request):
+    """Последние запросы к БД, выполнявшиеся дольше SLOW_QUERY_THRESHOLD"""
+    return render(request, "administrator/slow_queries.html", context={
+        "queries": get_slow_queries(),
+        "threshold": settings.SLOW_QUERY_THRESHOLD,
+    })
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def profiles(request):
+    """Список сохраненных профилей запросов"""
+    return render(request, "administrator/profiles.html", context={"profiles": get_profile_names()})
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def profile(request, name):
+    """Таблица самых затратных функций профилированного запроса"""
+    path = get_profile_path(name, "txt")
+    if path is None:
+        raise Http404()
+    with open(path, encoding="utf-8") as file:
+        return render(request, "administrator/profile.html", context={"name": name, "table": file.read()})
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_admin
+def download_profile(request, name):
+    """Скачивание дампа pstats профилированного запроса"""
+    path = get_profile_path(name, "prof")
+    if path is None:
+        raise Http404()
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{name}.prof")
@@ -51,11 +51,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.access_log.AccessLogMiddleware',
+    'main.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,6 +101,20 @@ DATABASES = {
 }
 AUTH_USER_MODEL = "user.User"
 
+# ModelBackend stays listed so that sessions created before CachedOrgBackend, which store its path, remain valid
+AUTHENTICATION_BACKENDS = ["account.backends.CachedOrgBackend", "django.contrib.auth.backends.ModelBackend"]
+
+# department and company of the authenticated user are cached for this many seconds;
+# processes share invalidations only through a shared cache backend such as memcached
+USER_ORG_CACHE_TIMEOUT = 60
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -145,16 +162,65 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# number of rows on a page of task and user lists
+PAGE_SIZE = 50
+
+# background exports of director reports
+EXPORT_FILES_DIR = os.path.join(BASE_DIR, "exports")
+EXPORT_FILES_LIFETIME = 24 * 60 * 60
+EXPORT_WORKER_INTERVAL = 5
+# a running export whose worker has not reported progress for this many seconds is taken over by another worker
+EXPORT_JOB_STALE_AFTER = 15 * 60
+
+# invitations older than this can no longer be used and are removed by purge_invitations
+INVITATION_LIFETIME = 14 * 24 * 60 * 60
+INVITATION_PURGE_BATCH_SIZE = 1000
+
 # email attributes
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_HOST_USER = "project.lacit@gmail.com"
 EMAIL_HOST_PASSWORD = "lacit123"
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
+EMAIL_TIMEOUT = 10
 SERVER_EMAIL = EMAIL_HOST_USER
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# outbox of emails delivered by the send_outbox_emails command; a claimed batch is leased to one sender for
+# OUTBOX_LEASE seconds and emails it could not send by then are picked up again
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_SENDER_INTERVAL = 5
+OUTBOX_LEASE = 300
+
+
+# Prometheus metrics served at /metrics; set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by all
+# web and worker processes (cleared on deploy) to aggregate their counters, and METRICS_TOKEN to require
+# an "Authorization: Bearer <token>" header from the scraper
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# JSON access log rotated at midnight or at ACCESS_LOG_MAX_BYTES, old segments are gzip-compressed
+ACCESS_LOG_FILE = os.path.join(BASE_DIR, "logs", "access.log")
+ACCESS_LOG_MAX_BYTES = 50 * 1024 * 1024
+ACCESS_LOG_BACKUP_COUNT = 60
+
+# queries slower than SLOW_QUERY_THRESHOLD milliseconds are kept in a ring buffer shown to administrators
+# and written to SLOW_QUERY_LOG_FILE
+SLOW_QUERY_THRESHOLD = int(os.environ.get("SLOW_QUERY_THRESHOLD", 100))
+SLOW_QUERY_BUFFER_SIZE = 200
+SLOW_QUERY_LOG_FILE = os.path.join(BASE_DIR, "logs", "slow_queries.log")
+
+# requests of administrators sent with an X-Profile header or a profile query parameter run under cProfile;
+# the latest PROFILES_KEEP profiles are stored in PROFILES_DIR
+PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
+PROFILES_KEEP = 50
+PROFILE_TOP_FUNCTIONS = 40
+
+# records are put on a queue on the request thread and written by a background listener thread
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
 LOGGING = {
     'version': 1,
@@ -165,6 +231,9 @@ LOGGING = {
         },
         'file': {
             'format': '%(asctime)s %(name)-12s %(levelname)-8s %(message)s'
+        },
+        'json': {
+            '()': 'main.access_log.JsonFormatter'
         }
     },
     'handlers': {
@@ -177,42 +246,67 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'formatter': 'file',
             'filename': 'debug.log'
+        },
+        'queue': {
+            'class': 'main.log_queue.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file']
+        },
+        'access_file': {
+            'class': 'main.access_log.CompressedRotatingFileHandler',
+            'formatter': 'json',
+            'filename': ACCESS_LOG_FILE,
+            'max_bytes': ACCESS_LOG_MAX_BYTES,
+            'backup_count': ACCESS_LOG_BACKUP_COUNT
+        },
+        'access_queue': {
+            'class': 'main.log_queue.QueueListenerHandler',
+            'handlers': ['cfg://handlers.access_file']
+        },
+        'slow_queries_file': {
+            'class': 'main.access_log.CompressedRotatingFileHandler',
+            'formatter': 'json',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'max_bytes': ACCESS_LOG_MAX_BYTES,
+            'backup_count': ACCESS_LOG_BACKUP_COUNT
+        },
+        'slow_queries_queue': {
+            'class': 'main.log_queue.QueueListenerHandler',
+            'handlers': ['cfg://handlers.slow_queries_file']
         }
     },
+    'root': {
+        'level': LOG_LEVEL,
+        'handlers': ['queue']
+    },
     'loggers': {
-        '': {
-            'level': 'DEBUG',
-            'handlers': ['console', 'file'],
-            'propagate': True
+        'access': {
+            'level': 'INFO',
+            'handlers': ['access_queue'],
+            'propagate': False
+        },
+        'slow_queries': {
+            'level': 'WARNING',
+            'handlers': ['slow_queries_queue'],
+            'propagate': False
+        },
+        'django': {
+            'level': LOG_LEVEL
         },
         'django.server': {
-            'handlers': ['console', 'file'],
-            'propagate': True,
             'level': 'INFO',
+            'propagate': True
         },
         'django.template': {
-            'handlers': ['console', 'file'],
-            'propagate': True,
-            'level': 'DEBUG',
+            'level': 'INFO'
         },
 #        'django.db.backends': {
-#            'handlers': ['console', 'file'],
-#            'propagate': True,
-#            'level': 'DEBUG',
+#            'level': 'DEBUG'
 #        },
         'django.security': {
-            'handlers': ['console', 'file'],
-            'propagate': True,
-            'level': 'DEBUG',
-        },
-        'django.security.csrf': {
-            'handlers': ['console', 'file'],
-            'propagate': True,
-            'level': 'DEBUG',
+            'level': 'DEBUG'
         },
         'django.request': {
-            'level': 'DEBUG',
-            'handlers': ['console', 'file']
+            'level': 'INFO'
         }
     }
 }
@@ -26,5 +26,6 @@ urlpatterns = [
     path('company/', include('company.urls')),
     path('department/', include('department.urls')),
     path('project/', include('project.urls')),
+    path('metrics', views.metrics, name='metrics'),
     path('', views.index, name='home'),
 ]
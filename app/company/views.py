@@ -6,6 +6,7 @@ from django.http import Http404
 
 from user.models import Company
 from main.views import decorator_adds_user_information_log
+from account.backends import invalidate_user_org
 from administrator.views import decorator_check_admin
 from company.forms import CompanyForm
 
@@ -38,6 +39,7 @@ def edit_company(request, id=None):
             if company:
                 company.name = form.cleaned_data['name']
                 company.save()
+                invalidate_user_org()
             else:
                 form.save()
             return redirect('/company/list')
@@ -6,6 +6,7 @@ from django.http import Http404
 
 from user.models import Company, Department
 from main.views import decorator_adds_user_information_log
+from account.backends import invalidate_user_org
 from administrator.views import decorator_check_admin
 from department.forms import DepartmentForm
 
@@ -53,6 +54,7 @@ def edit_department(request, company_id, id=None):
             for project in projects:
                 department.project.add(project)
             department.save()
+            invalidate_user_org()
             return redirect(f'/department/list/{company_id}/')
         else:
             messages.error(request, "Invalid data")
@@ -1,4 +1,4 @@
-from django.forms import Form, DateField, ModelMultipleChoiceField, ChoiceField
+from django.forms import Form, DateField, ModelMultipleChoiceField, ChoiceField, BooleanField
 from user.calendar import years
 from user.models import User
 from user import forms
@@ -8,7 +8,10 @@ class SelectionForm(forms.SelectionForm):
     """Форма для выборки данных пользователей отдела за различные периоды времени"""
     users = ModelMultipleChoiceField(queryset=User.objects.filter(role=3))
     uploading_data = ChoiceField(label='Uploading data in the format', choices=((1, 'no format'), (2, '.csv'),
-                                                                                (3, '.xlsx')))
+                                                                                (3, '.xlsx'), (4, '.parquet')))
+    report = ChoiceField(label='Report', required=False, choices=(('', 'all tasks'), ('week', 'hours by week'),
+                                                                  ('month', 'hours by month')))
+    in_background = BooleanField(label='Prepare the file in the background', required=False)
 
     def __init__(self, *args, **kwargs):
         self.department = kwargs.pop('department', None)
@@ -23,8 +26,9 @@ class SelectionForm(forms.SelectionForm):
         if not valid:
             return valid
 
+        department_id = self.department.id if self.department else None
         for user in self.cleaned_data['users']:
-            if user.department != self.department:
+            if user.department_id != department_id:
                 return False
 
         return True
@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from director.models import ExportJob
+from director.supporting import run_export_job, purge_expired_exports
+
+
+def claim_export_job():
+    """Забирает следующую ожидающую выгрузку или выгрузку, обработчик которой перестал сообщать о ходе работы,
+    пропуская заблокированные другими обработчиками"""
+    stale = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER)
+    with transaction.atomic():
+        job = ExportJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status=ExportJob.PENDING) | Q(status=ExportJob.RUNNING, heartbeat_at__lt=stale) |
+            Q(status=ExportJob.RUNNING, heartbeat_at=None)).order_by("created_at", "id").first()
+        if job is not None:
+            job.status, job.rows_written, job.heartbeat_at = ExportJob.RUNNING, 0, timezone.now()
+            job.save(update_fields=["status", "rows_written", "heartbeat_at"])
+    return job
+
+
+class Command(BaseCommand):
+    """Обработчик фоновых выгрузок данных, опрашивающий базу данных"""
+    help = "Builds pending director exports in the background"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="process pending jobs and exit")
+        parser.add_argument("--interval", type=float, default=settings.EXPORT_WORKER_INTERVAL,
+                            help="seconds between polls")
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_expired_exports()
+            if purged:
+                self.stdout.write(f"Purged {purged} expired exports")
+            job = claim_export_job()
+            while job is not None:
+                try:
+                    run_export_job(job)
+                    self.stdout.write(f"Export {job.id} done: {job.rows_written} rows")
+                except Exception as error:
+                    self.stderr.write(f"Export {job.id} failed: {error}")
+                job = claim_export_job()
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -1,3 +1,45 @@
 from django.db import models
+from user.models import User
 
-# Create your models here.
+
+class ExportJob(models.Model):
+    """Модель, описывающая таблицу фоновых выгрузок данных пользователей"""
+    PENDING, RUNNING, DONE, FAILED = 1, 2, 3, 4
+    STATUSES = ((PENDING, 'pending'), (RUNNING, 'running'), (DONE, 'done'), (FAILED, 'failed'))
+    FORMATS = ((2, '.csv'), (3, '.xlsx'), (4, '.parquet'))
+    EXTENSIONS = {2: 'csv', 3: 'xlsx', 4: 'parquet'}
+
+    director = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    users = models.ManyToManyField(User, related_name='+')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    file_format = models.SmallIntegerField(choices=FORMATS)
+    status = models.SmallIntegerField(choices=STATUSES, default=PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+    heartbeat_at = models.DateTimeField(null=True)
+    expires_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='export_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'Export {self.id} ({self.get_status_display()})'
+
+    @property
+    def progress(self) -> int:
+        """Процент выполнения выгрузки"""
+        if self.status == self.DONE:
+            return 100
+        return self.rows_written * 100 // self.rows_total if self.rows_total else 0
+
+    @property
+    def file_name(self) -> str:
+        """Имя файла выгрузки для скачивания"""
+        return f'data.{self.EXTENSIONS[self.file_format]}'
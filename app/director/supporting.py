@@ -1,30 +1,189 @@
 import csv
-import pandas
+import io
+import os
+import xlsxwriter
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncWeek, TruncMonth
+from django.utils import timezone
+from user.models import Task
+from director.models import ExportJob
+from main.prometheus import export_jobs_total, export_rows_total
 
 column_names = ["First name", "Last name", "Date", "Worked time", "Name project", "Description"]
+chunk_size = 2000
+summary_periods = {"week": (TruncWeek, "%G-W%V"), "month": (TruncMonth, "%Y-%m")}
+file_types = {2: ("data.csv", "text/csv"), 3: ("data.xlsx", "application/vnd.ms-excel"),
+              4: ("data.parquet", "application/vnd.apache.parquet")}
 
 
-def write_csv_file(array, file):
+class Echo:
+    """Псевдо-файл, который возвращает записываемую строку вместо ее хранения"""
+    def write(self, value):
+        return value
+
+
+def get_users_tasks(users, start_date, end_date):
+    """Задания пользователей за период одним запросом вместе с пользователем и проектом"""
+    return Task.objects.filter(user__in=users, date__range=(start_date, end_date)).select_related(
+        "user", "project").only("date", "time_worked", "description", "user__first_name", "user__last_name",
+                                "project__name").order_by("user_id", "date", "id")
+
+
+def iterate_tasks(tasks):
+    """Перебирает задания; QuerySet читается частями через серверный курсор"""
+    return tasks.iterator(chunk_size=chunk_size) if hasattr(tasks, "iterator") else tasks
+
+
+def get_csv_rows(tasks):
+    """Возвращает строки csv файла по одной"""
+    yield column_names
+    for task in iterate_tasks(tasks):
+        yield [task.user.first_name, task.user.last_name, str(task.date), task.time_worked,
+               task.project.name, task.description]
+
+
+def write_csv_file(tasks, file):
     """Записывает содержимое в csv файл"""
     writer = csv.writer(file, delimiter=";", lineterminator="\r")
-    writer.writerow(column_names)
-    for user, tasks in array.items():
-        for task in tasks:
-            writer.writerow([user.first_name, user.last_name, str(task.date), task.time_worked,
-                            task.project.name, task.description])
+    writer.writerows(get_csv_rows(tasks))
+    return file
+
+
+def stream_csv_file(tasks):
+    """Генерирует содержимое csv файла построчно, не накапливая его в памяти"""
+    writer = csv.writer(Echo(), delimiter=";", lineterminator="\r")
+    return (writer.writerow(row) for row in get_csv_rows(tasks))
+
+
+def write_xlsx_file(tasks, file):
+    """Записывает содержимое в xlsx файл построчно, не накапливая данные в памяти"""
+    workbook = xlsxwriter.Workbook(file, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, column_names)
+    for row, task in enumerate(iterate_tasks(tasks), start=1):
+        worksheet.write_string(row, 0, task.user.first_name)
+        worksheet.write_string(row, 1, task.user.last_name)
+        worksheet.write_datetime(row, 2, task.date)
+        worksheet.write_number(row, 3, task.time_worked)
+        worksheet.write_string(row, 4, task.project.name)
+        worksheet.write_string(row, 5, task.description)
+    workbook.close()
+    return file
+
+
+def write_parquet_file(tasks, file):
+    """Записывает содержимое в parquet файл типизированными сжатыми колонками, группами строк по chunk_size"""
+    import pyarrow
+    from pyarrow import parquet
+
+    schema = pyarrow.schema([("user_id", pyarrow.int64()), ("user", pyarrow.string()), ("date", pyarrow.date32()),
+                             ("minutes", pyarrow.int64()), ("project", pyarrow.string()),
+                             ("description", pyarrow.string())])
+
+    def write_batch(writer, rows):
+        writer.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(column, type=field.type) for column, field in zip(zip(*rows), schema)], schema=schema))
+
+    with parquet.ParquetWriter(file, schema, compression="zstd") as writer:
+        rows = []
+        for task in iterate_tasks(tasks):
+            rows.append((task.user_id, f"{task.user.first_name} {task.user.last_name}", task.date,
+                         task.time_worked, task.project.name, task.description))
+            if len(rows) == chunk_size:
+                write_batch(writer, rows)
+                rows = []
+        if rows:
+            write_batch(writer, rows)
     return file
 
 
-def write_xlsx_file(array, file):
-    """Записывает содержимое в xlsx файл"""
-    data_frame = {column_name: list() for column_name in column_names}
-    for user, tasks in array.items():
-        for task in tasks:
-            data_frame["First name"].append(user.first_name)
-            data_frame["Last name"].append(user.last_name)
-            data_frame["Date"].append(str(task.date))
-            data_frame["Worked time"].append(task.time_worked)
-            data_frame["Name project"].append(task.project.name)
-            data_frame["Description"].append(task.description)
-    pandas.DataFrame(data_frame).to_excel(file)
-    return file
\ No newline at end of file
+def get_summary(users, start_date, end_date, period):
+    """Сумма отработанного времени по пользователям, проектам и неделям (месяцам) одним запросом GROUP BY"""
+    return Task.objects.filter(user__in=users, date__range=(start_date, end_date)).annotate(
+        period=summary_periods[period][0]("date")).values(
+        "user_id", "user__first_name", "user__last_name", "project__name", "period").annotate(
+        time_worked=Sum("time_worked")).order_by()
+
+
+def pivot_summary(rows, period):
+    """Сводная таблица часов: строки - пользователь и проект, столбцы - недели (месяцы), с итогами"""
+    import pandas
+
+    data_frame = pandas.DataFrame(list(rows))
+    if data_frame.empty:
+        return pandas.DataFrame(columns=["Total"], index=pandas.MultiIndex.from_tuples([], names=["User", "Project"]))
+    data_frame["user"] = data_frame["user__first_name"] + " " + data_frame["user__last_name"]
+    data_frame["period"] = pandas.to_datetime(data_frame["period"]).dt.strftime(summary_periods[period][1])
+    data_frame["hours"] = data_frame["time_worked"] / 60
+    summary = data_frame.pivot_table(index=["user_id", "user", "project__name"], columns="period", values="hours",
+                                     aggfunc="sum", fill_value=0).droplevel("user_id")
+    summary.index.names, summary.columns.name = ["User", "Project"], None
+    summary["Total"] = summary.sum(axis=1)
+    summary.loc[("Total", ""), :] = summary.sum()
+    return summary.round(2)
+
+
+def write_summary_file(summary, file_format):
+    """Возвращает содержимое файла сводной таблицы в нужном формате"""
+    file = io.BytesIO()
+    if file_format == 2:
+        file.write(summary.to_csv(sep=";").encode())
+    elif file_format == 3:
+        summary.to_excel(file, engine="xlsxwriter")
+    else:
+        summary.to_parquet(file)
+    return file.getvalue()
+
+
+def track_progress(job, tasks):
+    """Перебирает задания, периодически сохраняя количество выгруженных строк"""
+    for row, task in enumerate(iterate_tasks(tasks), start=1):
+        yield task
+        if row % chunk_size == 0:
+            ExportJob.objects.filter(id=job.id).update(rows_written=row, heartbeat_at=timezone.now())
+
+
+def run_export_job(job):
+    """Формирует файл фоновой выгрузки в каталоге EXPORT_FILES_DIR"""
+    os.makedirs(settings.EXPORT_FILES_DIR, exist_ok=True)
+    path = os.path.join(settings.EXPORT_FILES_DIR, f"{job.id}.{ExportJob.EXTENSIONS[job.file_format]}")
+    tasks = get_users_tasks(job.users.all(), job.start_date, job.end_date)
+    job.rows_total, job.heartbeat_at = tasks.count(), timezone.now()
+    job.save(update_fields=["rows_total", "heartbeat_at"])
+    try:
+        if job.file_format == 2:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                write_csv_file(track_progress(job, tasks), file)
+        elif job.file_format == 3:
+            write_xlsx_file(track_progress(job, tasks), path)
+        else:
+            write_parquet_file(track_progress(job, tasks), path)
+    except Exception as error:
+        if os.path.exists(path):
+            os.remove(path)
+        job.status, job.error, job.finished_at = ExportJob.FAILED, str(error), timezone.now()
+        job.expires_at = job.finished_at + timedelta(seconds=settings.EXPORT_FILES_LIFETIME)
+        job.save(update_fields=["status", "error", "finished_at", "expires_at"])
+        export_jobs_total.labels(ExportJob.EXTENSIONS[job.file_format], "failed").inc()
+        raise
+    job.status, job.file_path, job.rows_written = ExportJob.DONE, path, job.rows_total
+    job.finished_at = timezone.now()
+    job.expires_at = job.finished_at + timedelta(seconds=settings.EXPORT_FILES_LIFETIME)
+    job.save(update_fields=["status", "file_path", "rows_written", "finished_at", "expires_at"])
+    export_jobs_total.labels(ExportJob.EXTENSIONS[job.file_format], "done").inc()
+    export_rows_total.labels(ExportJob.EXTENSIONS[job.file_format]).inc(job.rows_written)
+    return job
+
+
+def purge_expired_exports():
+    """Удаляет просроченные выгрузки вместе с их файлами, а также неудавшиеся выгрузки без срока хранения"""
+    now = timezone.now()
+    expired = ExportJob.objects.filter(Q(expires_at__lt=now) | Q(
+        status=ExportJob.FAILED, expires_at=None,
+        finished_at__lt=now - timedelta(seconds=settings.EXPORT_FILES_LIFETIME)))
+    for path in expired.exclude(file_path="").values_list("file_path", flat=True):
+        if os.path.exists(path):
+            os.remove(path)
+    return expired.delete()[1].get(ExportJob._meta.label, 0)
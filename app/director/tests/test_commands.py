@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from user.models import Department, Company, Project, Task
+from director.models import ExportJob
+from datetime import date, timedelta
+from io import StringIO
+from prometheus_client import REGISTRY
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import os
+
+User = get_user_model()
+
+
+class RunExportWorkerCommandTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.company = Company.objects.create(name="Abc")
+        cls.department = Department.objects.create(name="abc", company=cls.company)
+        cls.project = Project.objects.create(name="abc", company=cls.company)
+        cls.director = User.objects.create(password="", email="abc@mail.ru", role=2, first_name="abc",
+                                           last_name="abc", date_joined=timezone.now(), post="director",
+                                           department=cls.department)
+        cls.test_user = User.objects.create(password="", email="def@mail.ru", role=3, first_name="def",
+                                            last_name="def", date_joined=timezone.now(), post="user",
+                                            department=cls.department)
+        cls.task = Task.objects.create(date=date(2021, 5, 20), time_worked=120, description="abc",
+                                       project=cls.project, user=cls.test_user)
+
+    @classmethod
+    def tearDownClass(cls):
+        for elem in [cls.task, cls.test_user, cls.director, cls.project, cls.department, cls.company]:
+            elem.delete()
+
+    def create_job(self, file_format):
+        job = ExportJob.objects.create(director=self.director, start_date=date(2021, 5, 1),
+                                       end_date=date(2021, 5, 31), file_format=file_format)
+        job.users.set([self.test_user])
+        return job
+
+    def test_builds_pending_exports(self):
+        with TemporaryDirectory() as directory, override_settings(EXPORT_FILES_DIR=directory):
+            csv_job, xlsx_job = self.create_job(2), self.create_job(3)
+            rows = REGISTRY.get_sample_value("app_export_rows_total", {"format": "csv"}) or 0
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            self.assertEqual(REGISTRY.get_sample_value("app_export_rows_total", {"format": "csv"}), rows + 1)
+            for job in [csv_job, xlsx_job]:
+                job.refresh_from_db()
+                self.assertEqual(job.status, ExportJob.DONE)
+                self.assertEqual((job.rows_total, job.rows_written), (1, 1))
+                self.assertTrue(os.path.isfile(job.file_path))
+                self.assertGreater(job.expires_at, timezone.now())
+            with open(csv_job.file_path, encoding="utf-8") as file:
+                self.assertIn("def;def;2021-05-20;120;abc;abc", file.read())
+
+    def test_purges_expired_exports(self):
+        with TemporaryDirectory() as directory, override_settings(EXPORT_FILES_DIR=directory):
+            job = self.create_job(2)
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            job.refresh_from_db()
+            ExportJob.objects.filter(id=job.id).update(expires_at=timezone.now() - timedelta(seconds=1))
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            self.assertFalse(ExportJob.objects.filter(id=job.id).exists())
+            self.assertFalse(os.path.exists(job.file_path))
+
+    def test_reclaims_stale_running_exports(self):
+        with TemporaryDirectory() as directory, override_settings(EXPORT_FILES_DIR=directory):
+            stale, alive = self.create_job(2), self.create_job(2)
+            ExportJob.objects.filter(id=stale.id).update(
+                status=ExportJob.RUNNING, rows_written=1,
+                heartbeat_at=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER + 1))
+            ExportJob.objects.filter(id=alive.id).update(status=ExportJob.RUNNING, heartbeat_at=timezone.now())
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            stale.refresh_from_db()
+            alive.refresh_from_db()
+            self.assertEqual(stale.status, ExportJob.DONE)
+            self.assertTrue(os.path.isfile(stale.file_path))
+            self.assertEqual((alive.status, alive.file_path), (ExportJob.RUNNING, ""))
+
+    def test_purges_failed_exports(self):
+        with TemporaryDirectory() as directory, override_settings(EXPORT_FILES_DIR=directory):
+            job = self.create_job(2)
+            with patch("director.supporting.write_csv_file", side_effect=OSError("disk is full")):
+                call_command("run_export_worker", once=True, stdout=StringIO(), stderr=StringIO())
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.error), (ExportJob.FAILED, "disk is full"))
+            self.assertGreater(job.expires_at, timezone.now())
+            ExportJob.objects.filter(id=job.id).update(expires_at=timezone.now() - timedelta(seconds=1))
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            self.assertFalse(ExportJob.objects.filter(id=job.id).exists())
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from user.models import Department, Company
+from director.models import ExportJob
+from datetime import date
+
+User = get_user_model()
+
+
+class ExportJobModelTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.company = Company.objects.create(name="Abc")
+        cls.department = Department.objects.create(name="abc", company=cls.company)
+        cls.director = User.objects.create(password="", email="abc@mail.ru", role=2, first_name="abc",
+                                           last_name="abc", date_joined=timezone.now(), post="director",
+                                           department=cls.department)
+        cls.job = ExportJob.objects.create(director=cls.director, start_date=date(2021, 5, 1),
+                                           end_date=date(2021, 5, 31), file_format=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        for elem in [cls.job, cls.director, cls.department, cls.company]:
+            elem.delete()
+
+    def test_checking_default_status_export_job_model(self):
+        self.assertEqual(self.job.status, ExportJob.PENDING)
+        self.assertEqual(self.job.progress, 0)
+
+    def test_checking_progress_export_job_model(self):
+        self.assertEqual(ExportJob(rows_total=200, rows_written=50, status=ExportJob.RUNNING).progress, 25)
+        self.assertEqual(ExportJob(rows_total=0, status=ExportJob.DONE).progress, 100)
+
+    def test_checking_file_name_export_job_model(self):
+        self.assertEqual(self.job.file_name, "data.xlsx")
+        self.assertEqual(ExportJob(file_format=2).file_name, "data.csv")
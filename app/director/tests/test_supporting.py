@@ -1,5 +1,6 @@
 from django.test import TestCase
-from director.supporting import write_csv_file, write_xlsx_file
+from director.supporting import write_csv_file, write_xlsx_file, stream_csv_file, get_users_tasks, \
+    write_parquet_file, get_summary, pivot_summary
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from user.models import Department, Company, Project, Task
@@ -31,7 +32,7 @@ class SupportingTestCase(TestCase):
 
     def test_write_csv_file(self):
         with open("data.csv", "w") as file:
-            write_csv_file({self.test_user: [self.task]}, file)
+            write_csv_file([self.task], file)
         self.assertTrue(os.path.isfile("data.csv"))
         data = ["First name;Last name;Date;Worked time;Name project;Description", f"abc;abc;{date.today()};120;abc;abc"]
         with open("data.csv", newline="") as file:
@@ -40,15 +41,49 @@ class SupportingTestCase(TestCase):
                 self.assertEqual(row[0], data[i])
         os.remove("data.csv")
 
+    def test_stream_csv_file(self):
+        with self.assertNumQueries(1):
+            rows = list(stream_csv_file(get_users_tasks([self.test_user], date(2021, 1, 1), date.today())))
+        self.assertEqual(rows, ["First name;Last name;Date;Worked time;Name project;Description\r",
+                                f"abc;abc;{date.today()};120;abc;abc\r"])
 
     def test_write_xlsx_file(self):
-        write_xlsx_file({self.test_user: [self.task]}, "data.xlsx")
+        write_xlsx_file([self.task], "data.xlsx")
         self.assertTrue(os.path.isfile("data.xlsx"))
         excel_data_df = pandas.read_excel("data.xlsx")
         self.assertEqual(excel_data_df["First name"].tolist()[0], "abc")
         self.assertEqual(excel_data_df["Last name"].tolist()[0], "abc")
-        self.assertEqual(excel_data_df["Date"].tolist()[0], f"{date.today()}")
+        self.assertEqual(excel_data_df["Date"].tolist()[0].date(), date.today())
         self.assertEqual(excel_data_df["Worked time"].tolist()[0], 120)
         self.assertEqual(excel_data_df["Name project"].tolist()[0], "abc")
         self.assertEqual(excel_data_df["Description"].tolist()[0], "abc")
-        os.remove("data.xlsx")
\ No newline at end of file
+        os.remove("data.xlsx")
+
+    def test_write_parquet_file(self):
+        write_parquet_file(get_users_tasks([self.test_user], date(2021, 1, 1), date.today()), "data.parquet")
+        self.assertTrue(os.path.isfile("data.parquet"))
+        data_frame = pandas.read_parquet("data.parquet")
+        self.assertEqual(list(data_frame.columns), ["user_id", "user", "date", "minutes", "project", "description"])
+        self.assertEqual(data_frame["user"].tolist()[0], "abc abc")
+        self.assertEqual(data_frame["date"].tolist()[0], date.today())
+        self.assertEqual(data_frame["minutes"].tolist()[0], 120)
+        self.assertEqual(data_frame["project"].tolist()[0], "abc")
+        os.remove("data.parquet")
+
+    def test_pivot_summary(self):
+        task = Task.objects.create(date=date(2021, 5, 20), time_worked=90, description="def", project=self.project,
+                                   user=self.test_user)
+        Task.objects.create(date=date(2021, 5, 21), time_worked=30, description="def", project=self.project,
+                            user=self.test_user)
+        with self.assertNumQueries(1):
+            summary = pivot_summary(get_summary([self.test_user], date(2021, 5, 1), date(2021, 5, 31), "week"), "week")
+        self.assertEqual(list(summary.columns), ["2021-W20", "Total"])
+        self.assertEqual(summary.loc[("abc abc", "abc"), "2021-W20"], 2.0)
+        self.assertEqual(summary.loc[("Total", ""), "Total"], 2.0)
+        summary = pivot_summary(get_summary([self.test_user], date(2021, 5, 1), date(2021, 5, 31), "month"), "month")
+        self.assertEqual(list(summary.columns), ["2021-05", "Total"])
+        task.delete()
+
+    def test_pivot_summary_without_tasks(self):
+        summary = pivot_summary(get_summary([self.test_user], date(2011, 5, 1), date(2011, 5, 31), "week"), "week")
+        self.assertTrue(summary.empty)
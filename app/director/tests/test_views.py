@@ -1,9 +1,15 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.management import call_command
 from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from user.models import Department, Company
-from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from user.models import Department, Company, Project, Task
+from director.models import ExportJob
+from datetime import date, timedelta
+from io import StringIO
+from tempfile import TemporaryDirectory
 
 User = get_user_model()
 
@@ -37,6 +43,21 @@ class ViewsTestCase(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, 'director/user_data.html')
 
+    def test_pagination_user_data_view(self):
+        self.client.force_login(self.test_user2)
+        project = Project.objects.create(name="abc", company=self.company)
+        Task.objects.bulk_create([Task(date=date(2021, 6, 1) + timedelta(days=i), time_worked=60, description="abc",
+                                       project=project, user=self.test_user1) for i in range(3)])
+        with self.settings(PAGE_SIZE=2):
+            resp = self.client.get(reverse("user-data", args=[self.test_user1.id]))
+            self.assertEqual([task.date for task in resp.context["tasks"]], [date(2021, 6, 1), date(2021, 6, 2)])
+            self.assertTrue(resp.context["page"].has_next)
+            resp = self.client.get(reverse("user-data", args=[self.test_user1.id]),
+                                   {"after": resp.context["page"].next_cursor})
+            self.assertEqual([task.date for task in resp.context["tasks"]], [date(2021, 6, 3)])
+            self.assertFalse(resp.context["page"].has_next)
+            self.assertTrue(resp.context["page"].has_previous)
+
     def test_1_invalid_user_id_user_data_view(self):
         self.client.force_login(self.test_user2)
         resp = self.client.get(reverse("user-data", args=[100]))
@@ -80,6 +101,9 @@ class ViewsTestCase(TestCase):
         })
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp["Content-Type"], "text/csv")
+        self.assertTrue(resp.streaming)
+        self.assertEqual(b"".join(resp.streaming_content),
+                         b"First name;Last name;Date;Worked time;Name project;Description\r")
 
     def test_4_post_request_users_data_selection_view(self):
         self.client.force_login(self.test_user2)
@@ -91,6 +115,93 @@ class ViewsTestCase(TestCase):
         })
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp["Content-Type"], "application/vnd.ms-excel")
+        self.assertEqual(resp["Content-Disposition"], 'attachment; filename="data.xlsx"')
+
+    def test_5_post_request_users_data_selection_view(self):
+        self.client.force_login(self.test_user2)
+        resp = self.client.post(reverse("users-data-selection"), data={
+            "start_date": ["31/05/2021"],
+            "end_date": ["01/06/2021"],
+            "users": [f"{self.test_user1.id}"],
+            "uploading_data": ["4"]
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/vnd.apache.parquet")
+        self.assertEqual(resp["Content-Disposition"], 'attachment; filename="data.parquet"')
+        resp.close()
+
+    def test_summary_report_users_data_selection_view(self):
+        self.client.force_login(self.test_user2)
+        project = Project.objects.create(name="abc", company=self.company)
+        Task.objects.create(date=date(2021, 6, 1), time_worked=150, description="abc", project=project,
+                            user=self.test_user1)
+        data = {
+            "start_date": ["31/05/2021"],
+            "end_date": ["01/06/2021"],
+            "users": [f"{self.test_user1.id}"],
+            "report": ["month"],
+        }
+        resp = self.client.post(reverse("users-data-selection"), data={**data, "uploading_data": ["1"]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "director/users_data_summary.html")
+        self.assertEqual(resp.context["columns"], ["2021-06", "Total"])
+        self.assertEqual(resp.context["rows"], [("abc abc", "abc", [2.5, 2.5]), ("Total", "", [2.5, 2.5])])
+
+        resp = self.client.post(reverse("users-data-selection"), data={**data, "uploading_data": ["2"]})
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        self.assertEqual(resp.content.decode().splitlines()[1], "abc abc;abc;2.5;2.5")
+
+    def count_users_data_selection_queries(self, users, uploading_data):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.post(reverse("users-data-selection"), data={
+                "start_date": ["31/05/2021"],
+                "end_date": [date.today().strftime("%d/%m/%Y")],
+                "users": [f"{user.id}" for user in users],
+                "uploading_data": [uploading_data]
+            })
+            b"".join(resp.streaming_content) if resp.streaming else resp.content
+        return len(context)
+
+    def test_number_of_queries_users_data_selection_view(self):
+        self.client.force_login(self.test_user2)
+        expected = {uploading_data: self.count_users_data_selection_queries([self.test_user1], uploading_data)
+                    for uploading_data in ["1", "2", "3", "4"]}
+
+        project = Project.objects.create(name="abc", company=self.company)
+        users = [self.test_user1] + [User.objects.create(email=f"user{i}@mail.ru", role=3, first_name="abc",
+                                                         last_name="abc", post="user", department=self.department)
+                                     for i in range(5)]
+        Task.objects.bulk_create([Task(date=date(2021, 6, 1) + timedelta(days=i % 30), time_worked=60,
+                                       description="abc", project=project, user=users[i % len(users)])
+                                  for i in range(60)])
+        for uploading_data in ["1", "2", "3", "4"]:
+            self.assertEqual(self.count_users_data_selection_queries(users, uploading_data), expected[uploading_data])
+
+    def test_background_export_users_data_selection_view(self):
+        self.client.force_login(self.test_user2)
+        with TemporaryDirectory() as directory, override_settings(EXPORT_FILES_DIR=directory):
+            resp = self.client.post(reverse("users-data-selection"), data={
+                "start_date": ["31/05/2021"],
+                "end_date": ["01/06/2021"],
+                "users": [f"{self.test_user1.id}"],
+                "uploading_data": ["3"],
+                "in_background": ["on"],
+            })
+            self.assertRedirects(resp, reverse("export-jobs"))
+            job = ExportJob.objects.get(director=self.test_user2)
+            self.assertEqual(list(job.users.all()), [self.test_user1])
+
+            resp = self.client.get(reverse("export-jobs"))
+            self.assertEqual(resp.status_code, 200)
+            self.assertTemplateUsed(resp, "director/export_jobs.html")
+            self.assertTrue(resp.context["in_progress"])
+            self.assertEqual(self.client.get(reverse("download-export", args=[job.id])).status_code, 404)
+
+            call_command("run_export_worker", once=True, stdout=StringIO())
+            resp = self.client.get(reverse("download-export", args=[job.id]))
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp["Content-Disposition"], 'attachment; filename="data.xlsx"')
+            resp.close()
 
     def test_checks_access_with_different_role_index_view(self):
         self.client.force_login(self.test_user1)
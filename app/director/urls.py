@@ -4,5 +4,7 @@ from director import views
 urlpatterns = [
     path('user-data/<int:user_id>', views.user_data, name='user-data'),
     path('users-data-selection/', views.users_data_selection, name='users-data-selection'),
+    path('export-jobs/', views.export_jobs, name='export-jobs'),
+    path('download-export/<int:job_id>', views.download_export, name='download-export'),
     path('', views.index, name='director-page'),
 ]
@@ -1,12 +1,17 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
+from django.utils import timezone
 from user.models import User, Task
+from director.models import ExportJob
 from director.forms import SelectionForm
 from django.contrib import messages
-from django.http import HttpResponse, Http404
-from director.supporting import write_csv_file, write_xlsx_file
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse, Http404
+from director.supporting import get_users_tasks, stream_csv_file, write_xlsx_file, write_parquet_file, \
+    get_summary, pivot_summary, write_summary_file, file_types
 from django.urls import reverse_lazy
 from main.views import decorator_adds_user_information_log
+from main.pagination import get_keyset_page, get_carried_fields
+from tempfile import TemporaryFile
 
 
 def decorator_check_director(func):
@@ -39,8 +44,10 @@ def user_data(request, user_id):
     except User.DoesNotExist:
         raise Http404()
     if get_user in User.objects.filter(department=request.user.department, role=3):
-        tasks = Task.objects.filter(user=get_user)
-        return render(request, "director/user_data.html", context={"get_user": get_user, "tasks": tasks})
+        page = get_keyset_page(Task.objects.filter(user=get_user).select_related("project"), ("date", "id"),
+                               after=request.GET.get("after"), before=request.GET.get("before"))
+        return render(request, "director/user_data.html", context={"get_user": get_user, "tasks": page,
+                                                                   "page": page})
     else:
         raise Http404()
 
@@ -55,18 +62,47 @@ def users_data_selection(request):
         if form.is_valid():
             start_date, end_date, users, file_format = form.cleaned_data["start_date"], form.cleaned_data["end_date"],\
                                           form.cleaned_data["users"], int(form.cleaned_data["uploading_data"])
-            array = {user: Task.objects.filter(user=user).exclude(date__gt=end_date).exclude(date__lt=start_date)
-                     for user in users}
+            if form.cleaned_data["report"]:
+                summary = pivot_summary(get_summary(users, start_date, end_date, form.cleaned_data["report"]),
+                                        form.cleaned_data["report"])
+                if file_format == 1:
+                    return render(request, "director/users_data_summary.html", context={
+                        "columns": list(summary.columns),
+                        "rows": [(*index, values) for index, values in zip(summary.index, summary.to_numpy().tolist())],
+                    })
+                file_name, content_type = file_types[file_format]
+                response = HttpResponse(write_summary_file(summary, file_format), content_type=content_type)
+                response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+                return response
+            if form.cleaned_data["in_background"] and file_format != 1:
+                job = ExportJob.objects.create(director=request.user, start_date=start_date, end_date=end_date,
+                                               file_format=file_format)
+                job.users.set(users)
+                return redirect("export-jobs")
+            tasks = get_users_tasks(users, start_date, end_date)
             if file_format == 1:
-                return render(request, "director/users_data_selection.html", context={"array": array})
+                page = get_keyset_page(tasks, ("user_id", "date", "id"), after=request.POST.get("after"),
+                                       before=request.POST.get("before"))
+                return render(request, "director/users_data_selection.html", context={
+                    "tasks": page,
+                    "page": page,
+                    "page_method": "post",
+                    "page_fields": get_carried_fields(request.POST),
+                })
             elif file_format == 2:
-                response = HttpResponse(content_type='text/csv')
+                response = StreamingHttpResponse(stream_csv_file(tasks), content_type='text/csv')
                 response['Content-Disposition'] = 'attachment; filename="data.csv"'
-                return write_csv_file(array, response)
+                return response
+            elif file_format == 3:
+                file = write_xlsx_file(tasks, TemporaryFile())
+                file.seek(0)
+                return FileResponse(file, as_attachment=True, filename="data.xlsx",
+                                    content_type='application/vnd.ms-excel')
             else:
-                response = HttpResponse(content_type='application/vnd.ms-excel')
-                response['Content-Disposition'] = 'attachment; filename="data.xlsx"'
-                return write_xlsx_file(array, response)
+                file = write_parquet_file(tasks, TemporaryFile())
+                file.seek(0)
+                return FileResponse(file, as_attachment=True, filename="data.parquet",
+                                    content_type='application/vnd.apache.parquet')
         else:
             messages.error(request, "Invalid data")
     return render(request, "selection_form.html", context={
@@ -75,3 +111,29 @@ def users_data_selection(request):
         "url_back": reverse_lazy('director-page'),
         "button_name": "Execute"
     })
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_director
+def export_jobs(request):
+    """Состояние фоновых выгрузок руководителя"""
+    jobs = ExportJob.objects.filter(director=request.user).order_by("-created_at")
+    return render(request, "director/export_jobs.html", context={
+        "jobs": jobs,
+        "in_progress": any(job.status in (ExportJob.PENDING, ExportJob.RUNNING) for job in jobs),
+    })
+
+
+@login_required
+@decorator_adds_user_information_log
+@decorator_check_director
+def download_export(request, job_id):
+    """Скачивание готового файла фоновой выгрузки"""
+    try:
+        job = ExportJob.objects.get(id=job_id, director=request.user, status=ExportJob.DONE,
+                                    expires_at__gt=timezone.now())
+        file = open(job.file_path, "rb")
+    except (ExportJob.DoesNotExist, OSError):
+        raise Http404()
+    return FileResponse(file, as_attachment=True, filename=job.file_name)
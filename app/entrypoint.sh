@@ -4,4 +4,6 @@ python manage.py makemigrations --no-input
 
 python manage.py migrate --no-input
 
+python manage.py rebuild_task_totals --if-empty
+
 python manage.py runserver 0.0.0.0:8000
@@ -0,0 +1,131 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import TimedRotatingFileHandler
+from django.db import connection
+from django.utils.functional import LazyObject, empty
+from main.metrics import QueryTimer, on_response_finished
+
+logger = logging.getLogger("access")
+request_id_pattern = re.compile(r"[\w.-]{1,64}")
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись журнала в одну компактную строку JSON"""
+
+    def format(self, record):
+        data = getattr(record, "fields", None) or {"message": record.getMessage()}
+        return json.dumps({"time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+            timespec="milliseconds"), **data}, ensure_ascii=False, separators=(",", ":"))
+
+
+def compress_segment(source: str, dest: str):
+    """Сжимает закрытый сегмент журнала в gzip и удаляет исходный файл"""
+    with open(source, "rb") as plain, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+
+class CompressedRotatingFileHandler(TimedRotatingFileHandler):
+    """Обработчик, начинающий новый файл по времени или по размеру и сжимающий старые сегменты в gzip"""
+
+    def __init__(self, filename, max_bytes=0, when="midnight", backup_count=0, utc=True):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True, utc=utc)
+        self.max_bytes = max_bytes
+        self.rotator = compress_segment
+
+    def rotation_filename(self, default_name):
+        number = 1
+        while os.path.exists(f"{default_name}.{number:03d}.gz"):
+            number += 1
+        return f"{default_name}.{number:03d}.gz"
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return 1
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return 1
+        return 0
+
+    def getFilesToDelete(self):
+        segments = [segment for segment in get_segments(self.baseFilename) if segment.endswith(".gz")]
+        return segments[:max(len(segments) - self.backupCount, 0)]
+
+
+def get_segments(filename: str) -> list:
+    """Сжатые сегменты журнала в порядке создания и текущий файл последним"""
+    segments = sorted(glob.glob(glob.escape(filename) + ".*.gz"))
+    return segments + [filename] if os.path.exists(filename) else segments
+
+
+def iterate_records(filename: str):
+    """Построчно читает записи из всех сегментов журнала, не загружая их в память целиком"""
+    for segment in get_segments(filename):
+        with (gzip.open if segment.endswith(".gz") else open)(segment, "rt", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def get_request_id(request) -> str:
+    """Идентификатор запроса из заголовка X-Request-ID прокси или новый случайный"""
+    request_id = request.headers.get("X-Request-ID", "")
+    return request_id if request_id_pattern.fullmatch(request_id) else uuid.uuid4().hex
+
+
+def get_loaded_user_id(request):
+    """Идентификатор пользователя, только если он уже загружен обработчиком запроса, без обращения к сессии"""
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject):
+        user = user._wrapped
+    if user is None or user is empty:
+        return None
+    return user.id
+
+
+class AccessLogMiddleware:
+    """Middleware, записывающий каждый запрос в журнал доступа одной строкой JSON"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.request_id = get_request_id(request)
+        if not logger.isEnabledFor(logging.INFO):
+            response = self.get_response(request)
+            response["X-Request-ID"] = request.request_id
+            return response
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        response["X-Request-ID"] = request.request_id
+
+        def finish():
+            logger.info("%s %s", request.method, request.path, extra={"fields": {
+                "request_id": request.request_id,
+                "user": get_loaded_user_id(request),
+                "view": match.view_name if match else None,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+                "db_ms": round(timer.seconds * 1000, 2),
+                "queries": timer.count,
+            }})
+
+        return on_response_finished(response, timer, finish)
@@ -0,0 +1,38 @@
+import atexit
+import logging
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+def resolve_handlers(handlers) -> list:
+    """Список обработчиков, уже созданных dictConfig по ссылкам cfg://handlers.<имя>"""
+    if isinstance(handlers, ConvertingList):
+        return [handlers[i] for i in range(len(handlers))]
+    return list(handlers)
+
+
+class QueueListenerHandler(logging.Handler):
+    """Обработчик, ставящий записи журнала в очередь; запись в handlers выполняется в отдельном потоке.
+    Не наследует QueueHandler: начиная с Python 3.12 dictConfig иначе настраивает такие обработчики сам"""
+
+    def __init__(self, handlers, respect_handler_level=True):
+        super().__init__()
+        self.queue_handler = QueueHandler(SimpleQueue())
+        self.listener = QueueListener(self.queue_handler.queue, *resolve_handlers(handlers),
+                                      respect_handler_level=respect_handler_level)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def emit(self, record):
+        self.queue_handler.emit(record)
+
+    def stop(self):
+        """Останавливает поток записи, дописав все записи из очереди"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        self.queue_handler.close()
+        super().close()
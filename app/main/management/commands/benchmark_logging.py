@@ -0,0 +1,71 @@
+import logging
+import os
+import tempfile
+from io import StringIO
+from timeit import timeit
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rich.console import Console
+from rich.logging import RichHandler
+from main.log_queue import QueueListenerHandler
+from main.views import decorator_adds_user_information_log
+
+logger_name = "benchmark_logging.view"
+
+
+def legacy_decorator_adds_user_information_log(func):
+    """Прежняя реализация: logger ищется и сообщение форматируется при каждом запросе"""
+    def wrapped(request, **kwargs):
+        logger = logging.getLogger(func.__module__)
+        logger.info(f"A user with id={request.user.id} turned to {request.get_full_path()}")
+        return func(request, **kwargs)
+    return wrapped
+
+
+def view(request):
+    return None
+
+
+class Command(BaseCommand):
+    """Измеряет задержку, которую журналирование добавляет к обработке запроса"""
+    help = "Measures the per-request logging overhead of decorator_adds_user_information_log"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=5000, help="requests per measurement")
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        request = RequestFactory().get("/user/list-tasks/2021/6/1/?page=2")
+        request.user = SimpleNamespace(id=1)
+        view.__module__ = logger_name
+        logger = logging.getLogger(logger_name)
+        logger.propagate = False
+        file_name = os.path.join(tempfile.mkdtemp(), "benchmark.log")
+
+        def make_handlers():
+            console = RichHandler(console=Console(file=StringIO(), force_terminal=True))
+            console.setFormatter(logging.Formatter("%(name)-12s %(levelname)-8s %(message)s"))
+            file = logging.FileHandler(file_name)
+            file.setFormatter(logging.Formatter("%(asctime)s %(name)-12s %(levelname)-8s %(message)s"))
+            return [console, file]
+
+        def measure(decorator, handlers, level=logging.DEBUG):
+            logger.handlers = handlers
+            logger.setLevel(level)
+            wrapped = decorator(view)
+            seconds = timeit(lambda: wrapped(request), number=number)
+            for handler in handlers:
+                handler.close()
+            return seconds
+
+        results = [
+            ("synchronous handlers", measure(legacy_decorator_adds_user_information_log, make_handlers())),
+            ("queue handler", measure(decorator_adds_user_information_log,
+                                      [QueueListenerHandler(make_handlers())])),
+            ("level gated off", measure(decorator_adds_user_information_log,
+                                        [QueueListenerHandler(make_handlers())], logging.WARNING)),
+        ]
+        logger.handlers = []
+        for name, seconds in results:
+            self.stdout.write(f"{name:<22} {seconds / number * 1e6:10.2f} us/request")
@@ -0,0 +1,42 @@
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from main.access_log import iterate_records
+
+
+def count_views_per_hour(records) -> Counter:
+    """Количество запросов к каждому представлению за каждый час"""
+    return Counter((record["time"][:13], record.get("view")) for record in records)
+
+
+def get_slowest_paths(records, limit: int) -> list:
+    """Пути с наибольшим средним временем ответа в виде (путь, число запросов, среднее, максимум)"""
+    paths = defaultdict(lambda: [0, 0.0, 0.0])
+    for record in records:
+        stats = paths[record["path"]]
+        stats[0] += 1
+        stats[1] += record["ms"]
+        stats[2] = max(stats[2], record["ms"])
+    rows = [(path, count, total / count, longest) for path, (count, total, longest) in paths.items()]
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:limit]
+
+
+class Command(BaseCommand):
+    """Строит отчеты по журналу доступа, последовательно читая его сегменты"""
+    help = "Answers questions about the JSON access log by streaming over its rotated segments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("report", choices=["views-per-hour", "slowest-paths"])
+        parser.add_argument("--file", default=settings.ACCESS_LOG_FILE, help="current access log file")
+        parser.add_argument("--since", default="", help="skip records before this ISO time, e.g. 2021-06-01T10")
+        parser.add_argument("--limit", type=int, default=20, help="rows in the slowest-paths report")
+
+    def handle(self, *args, **options):
+        records = (record for record in iterate_records(options["file"]) if record.get("time", "") >= options["since"]
+                   and "path" in record)
+        if options["report"] == "views-per-hour":
+            for (hour, view), count in sorted(count_views_per_hour(records).items()):
+                self.stdout.write(f"{hour}:00  {view or '-':<32} {count:8d}")
+        else:
+            for path, count, mean, longest in get_slowest_paths(records, options["limit"]):
+                self.stdout.write(f"{mean:10.2f} ms avg {longest:10.2f} ms max {count:8d}  {path}")
@@ -0,0 +1,158 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import partial
+from django.conf import settings
+from django.db import connection
+from main.prometheus import observe_request
+from main.slow_queries import capture_slow_query
+
+TIME_BOUNDS = tuple(round(0.1 * 1.2 ** i, 3) for i in range(75))
+QUERY_BOUNDS = tuple(range(21)) + (25, 30, 40, 50, 75, 100, 150, 200, 300, 500, 1000)
+PERCENTILES = (50, 95, 99)
+
+
+class QueryTimer:
+    """Обертка выполнения запросов к БД, считающая их количество и суммарное время;
+    запросы дольше threshold секунд передаются в on_slow(sql, seconds)"""
+
+    def __init__(self, on_slow=None, threshold: float = 0.0):
+        self.count = 0
+        self.seconds = 0.0
+        self.on_slow = on_slow
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - start
+            self.seconds += seconds
+            self.count += 1
+            if self.on_slow is not None and seconds >= self.threshold:
+                self.on_slow(sql, seconds)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин; хранит только счетчики, поэтому память не растет"""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent: float):
+        """Оценка перцентиля линейной интерполяцией внутри корзины"""
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[index - 1] if index else self.min
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                value = low + (high - low) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+
+class ViewMetrics:
+    """Гистограммы времени ответа, времени БД и числа запросов одного представления"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wall_ms = Histogram(TIME_BOUNDS)
+        self.db_ms = Histogram(TIME_BOUNDS)
+        self.queries = Histogram(QUERY_BOUNDS)
+
+    def add(self, wall_ms: float, db_ms: float, queries: int):
+        with self.lock:
+            self.wall_ms.add(wall_ms)
+            self.db_ms.add(db_ms)
+            self.queries.add(queries)
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {"count": self.wall_ms.count, **{
+                name: [histogram.percentile(percent) for percent in PERCENTILES]
+                for name, histogram in (("wall_ms", self.wall_ms), ("db_ms", self.db_ms), ("queries", self.queries))}}
+
+
+registry = {}
+registry_lock = threading.Lock()
+started_at = time.time()
+
+
+def record(view_name: str, wall_ms: float, db_ms: float, queries: int):
+    """Добавляет измерения одного запроса в гистограммы представления"""
+    metrics = registry.get(view_name)
+    if metrics is None:
+        with registry_lock:
+            metrics = registry.setdefault(view_name, ViewMetrics())
+    metrics.add(wall_ms, db_ms, queries)
+
+
+def get_summary() -> list:
+    """Перцентили по представлениям, начиная с самых медленных по p95 времени ответа"""
+    rows = [{"view": view_name, **metrics.summary()} for view_name, metrics in list(registry.items())]
+    return sorted(rows, key=lambda row: row["wall_ms"][1] or 0, reverse=True)
+
+
+def reset():
+    """Очищает накопленные измерения"""
+    with registry_lock:
+        registry.clear()
+
+
+def on_response_finished(response, timer: QueryTimer, callback):
+    """Вызывает callback по завершении ответа; для потокового ответа - после чтения его содержимого,
+    продолжая учитывать в timer запросы, выполняемые при чтении"""
+    if not response.streaming:
+        callback()
+        return response
+    content = response.streaming_content
+
+    def stream():
+        try:
+            with connection.execute_wrapper(timer):
+                yield from content
+        finally:
+            callback()
+
+    response.streaming_content = stream()
+    return response
+
+
+class MetricsMiddleware:
+    """Middleware, собирающий время ответа, время БД и число запросов по имени представления"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer(partial(capture_slow_query, request), settings.SLOW_QUERY_THRESHOLD / 1000)
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+
+        def finish():
+            wall = time.perf_counter() - start
+            if match is not None:
+                record(match.view_name, wall * 1000, timer.seconds * 1000, timer.count)
+            observe_request(match.view_name if match else "", request.method, response.status_code, wall,
+                            timer.seconds, timer.count)
+
+        return on_response_finished(response, timer, finish)
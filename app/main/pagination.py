@@ -0,0 +1,64 @@
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """Страница выборки, полученная по ключу последней записи (seek), а не через OFFSET"""
+    def __init__(self, items: list, fields: tuple, has_previous: bool, has_next: bool):
+        self.items, self.has_previous, self.has_next = items, has_previous, has_next
+        self.previous_cursor = encode_cursor(items[0], fields) if items else ""
+        self.next_cursor = encode_cursor(items[-1], fields) if items else ""
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(obj, fields: tuple) -> str:
+    """Кодирует значения полей упорядочивания записи в строку"""
+    return json.dumps([str(getattr(obj, field)) for field in fields], ensure_ascii=False)
+
+
+def decode_cursor(model, fields: tuple, cursor: str):
+    """Разбирает строку курсора в значения полей, None - если курсор некорректен"""
+    try:
+        values = json.loads(cursor)
+        if not isinstance(values, list) or len(values) != len(fields) or \
+                not all(isinstance(value, str) for value in values):
+            return None
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def get_seek_filter(fields: tuple, values: list, lookup: str) -> Q:
+    """Условие (f1, f2, ...) > (v1, v2, ...) (или <) в виде Q"""
+    condition = Q()
+    for position, field in enumerate(fields):
+        condition |= Q(**dict(zip(fields[:position], values[:position])), **{f"{field}__{lookup}": values[position]})
+    return condition
+
+
+def get_keyset_page(queryset, fields: tuple, after: str = None, before: str = None, page_size: int = None):
+    """Возвращает страницу queryset, упорядоченного по fields, после курсора after или перед курсором before"""
+    page_size = page_size or settings.PAGE_SIZE
+    values = decode_cursor(queryset.model, fields, before) if before else None
+    if values is not None:
+        items = list(queryset.filter(get_seek_filter(fields, values, "lt")).order_by(
+            *[f"-{field}" for field in fields])[:page_size + 1])
+        return KeysetPage(items[:page_size][::-1], fields, len(items) > page_size, True)
+    values = decode_cursor(queryset.model, fields, after) if after else None
+    if values is not None:
+        queryset = queryset.filter(get_seek_filter(fields, values, "gt"))
+    items = list(queryset.order_by(*fields)[:page_size + 1])
+    return KeysetPage(items[:page_size], fields, values is not None, len(items) > page_size)
+
+
+def get_carried_fields(query_dict) -> list:
+    """Поля запроса, которые нужно передать на следующую страницу"""
+    return [(name, value) for name, values in query_dict.lists()
+            if name not in ("csrfmiddlewaretoken", "after", "before") for value in values]
@@ -0,0 +1,73 @@
+import cProfile
+import os
+import pstats
+import re
+import time
+from io import StringIO
+from django.conf import settings
+
+profile_name_pattern = re.compile(r"\d{8}T\d{6}-[\w.-]{1,64}")
+
+
+def is_profiling_requested(request) -> bool:
+    """Запрошено ли профилирование: заголовок X-Profile или параметр profile от администратора"""
+    if "HTTP_X_PROFILE" not in request.META and "profile" not in request.GET:
+        return False
+    user = getattr(request, "user", None)
+    return user is not None and user.is_authenticated and user.role == 1
+
+
+def save_profile(profile, request, response, seconds: float) -> str:
+    """Сохраняет дамп pstats и таблицу самых затратных по cumulative функций; возвращает имя профиля"""
+    os.makedirs(settings.PROFILES_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{getattr(request, 'request_id', None) or os.getpid()}"
+    profile.dump_stats(os.path.join(settings.PROFILES_DIR, f"{name}.prof"))
+    stream = StringIO()
+    match = getattr(request, "resolver_match", None)
+    stream.write(f"{request.method} {request.get_full_path()}\nview: {match.view_name if match else '-'}\n"
+                 f"user: {request.user.id}\nstatus: {response.status_code}\ntime: {seconds * 1000:.1f} ms\n\n")
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(settings.PROFILE_TOP_FUNCTIONS)
+    with open(os.path.join(settings.PROFILES_DIR, f"{name}.txt"), "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+    for old in get_profile_names()[settings.PROFILES_KEEP:]:
+        for extension in ("prof", "txt"):
+            path = os.path.join(settings.PROFILES_DIR, f"{old}.{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+    return name
+
+
+def get_profile_names() -> list:
+    """Имена сохраненных профилей, начиная с самых новых"""
+    if not os.path.isdir(settings.PROFILES_DIR):
+        return []
+    names = {file_name.rsplit(".", 1)[0] for file_name in os.listdir(settings.PROFILES_DIR)}
+    return sorted((name for name in names if profile_name_pattern.fullmatch(name)), reverse=True)
+
+
+def get_profile_path(name: str, extension: str):
+    """Путь к файлу профиля или None, если имя неверное или файла нет"""
+    if not profile_name_pattern.fullmatch(name):
+        return None
+    path = os.path.join(settings.PROFILES_DIR, f"{name}.{extension}")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """Middleware, выполняющий запрос администратора под cProfile, если он запросил профилирование"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_profiling_requested(request):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        response["X-Profile-ID"] = save_profile(profile, request, response, time.perf_counter() - start)
+        return response
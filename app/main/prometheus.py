@@ -0,0 +1,40 @@
+import os
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+requests_total = Counter("app_requests_total", "HTTP requests by view, method and status",
+                         ["view", "method", "status"])
+request_duration = Histogram("app_request_duration_seconds", "Time to handle an HTTP request by view", ["view"],
+                             buckets=LATENCY_BUCKETS)
+db_queries_total = Counter("app_db_queries_total", "Database queries executed while handling requests", ["view"])
+db_duration = Counter("app_db_query_duration_seconds", "Time spent in database queries while handling requests",
+                      ["view"])
+export_jobs_total = Counter("app_export_jobs_total", "Finished background exports by format and status",
+                            ["format", "status"])
+export_rows_total = Counter("app_export_rows_total", "Rows written by background exports", ["format"])
+invitation_emails_total = Counter("app_invitation_emails_total", "Invitation emails delivered from the outbox",
+                                  ["result"])
+
+
+def observe_request(view: str, method: str, status: int, seconds: float, db_seconds: float, queries: int):
+    """Добавляет измерения одного запроса к метрикам"""
+    requests_total.labels(view, method, status).inc()
+    request_duration.labels(view).observe(seconds)
+    if queries:
+        db_queries_total.labels(view).inc(queries)
+        db_duration.labels(view).inc(db_seconds)
+
+
+def get_registry():
+    """Реестр метрик; в многопроцессном режиме собирает значения всех процессов из общего каталога"""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> bytes:
+    """Метрики в текстовом формате Prometheus"""
+    return generate_latest(get_registry())
@@ -0,0 +1,54 @@
+import logging
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from django.conf import settings
+
+logger = logging.getLogger("slow_queries")
+
+literal_patterns = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+buffer = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+buffer_lock = threading.Lock()
+
+
+def get_fingerprint(sql: str) -> str:
+    """Текст запроса без параметров и литералов, одинаковый для всех запросов одной формы"""
+    for pattern, replacement in literal_patterns:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def capture_slow_query(request, sql: str, seconds: float):
+    """Сохраняет медленный запрос в кольцевой буфер и в журнал медленных запросов"""
+    match = getattr(request, "resolver_match", None)
+    entry = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "request_id": getattr(request, "request_id", None),
+        "view": match.view_name if match else None,
+        "path": request.path,
+        "ms": round(seconds * 1000, 2),
+        "sql": get_fingerprint(sql),
+    }
+    with buffer_lock:
+        buffer.append(entry)
+    logger.warning("%s ms %s", entry["ms"], entry["sql"], extra={"fields": entry})
+
+
+def get_slow_queries() -> list:
+    """Последние медленные запросы, начиная с самых новых"""
+    with buffer_lock:
+        return list(reversed(buffer))
+
+
+def clear():
+    """Очищает кольцевой буфер"""
+    with buffer_lock:
+        buffer.clear()
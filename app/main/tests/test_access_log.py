@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.access_log import CompressedRotatingFileHandler, JsonFormatter, get_segments, iterate_records
+from user.models import User, Company, Department, Project, Task
+
+
+class CapturingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.fields)
+
+
+class AccessLogMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='department1', company=Company.objects.create(name='company1'))
+        cls.user = User.objects.create_user(first_name='John', last_name='Connor', email='JohnConnor@email.com',
+                                            department=department, post='leader', role=3, password='12345678')
+
+    def setUp(self):
+        self.handler = CapturingHandler()
+        self.logger = logging.getLogger('access')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.setLevel(logging.NOTSET)
+
+    def test_records_request(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('user-page'))
+        [record] = self.handler.records
+        self.assertEqual(record['user'], self.user.id)
+        self.assertEqual(record['view'], 'user-page')
+        self.assertEqual(record['path'], '/user/')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreaterEqual(record['ms'], 0)
+
+    def test_records_streamed_response_after_body(self):
+        project = Project.objects.create(name='project1', company=self.user.department.company)
+        Task.objects.create(user=self.user, project=project, time_worked=60, date='2021-05-20', description='task')
+        director = User.objects.create_user(first_name='Sarah', last_name='Connor', email='SarahConnor@email.com',
+                                            department=self.user.department, post='leader', role=2, password='1')
+        self.client.force_login(director)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(reverse('users-data-selection'), {
+                'start_date': '01/05/2021', 'end_date': '31/05/2021', 'users': [self.user.id], 'uploading_data': 2})
+            self.assertEqual(self.handler.records, [])
+            b''.join(resp.streaming_content)
+        [record] = self.handler.records
+        self.assertEqual(record['view'], 'users-data-selection')
+        self.assertEqual(record['queries'], len(queries))
+
+    def test_does_not_load_user(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('login'))
+        [record] = self.handler.records
+        self.assertEqual(len(queries), 0)
+        self.assertIsNone(record['user'])
+        self.assertEqual(record['queries'], 0)
+
+
+class CompressedRotatingFileHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'logs', 'access.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_records(self, count, backup_count):
+        handler = CompressedRotatingFileHandler(self.file_name, max_bytes=1000, backup_count=backup_count)
+        handler.setFormatter(JsonFormatter())
+        for i in range(count):
+            handler.handle(logging.makeLogRecord({'fields': {'path': f'/user/{i}/', 'ms': i}}))
+        handler.close()
+
+    def test_rotates_by_size_and_compresses_segments(self):
+        self.write_records(100, backup_count=100)
+        segments = get_segments(self.file_name)
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(segment.endswith('.gz') for segment in segments[:-1]))
+        self.assertTrue(all(os.path.getsize(segment) < 1000 for segment in segments))
+        self.assertEqual([record['path'] for record in iterate_records(self.file_name)],
+                         [f'/user/{i}/' for i in range(100)])
+
+    def test_keeps_backup_count_segments(self):
+        self.write_records(100, backup_count=2)
+        self.assertEqual(len(get_segments(self.file_name)), 3)
+
+    def test_query_command(self):
+        os.makedirs(os.path.dirname(self.file_name))
+        with open(self.file_name, 'w') as file:
+            for hour, view, path, ms in [('10', 'user-page', '/user/', 5), ('10', 'user-page', '/user/', 15),
+                                         ('11', 'select-tasks', '/user/select-tasks/', 200)]:
+                file.write(json.dumps({'time': f'2021-06-01T{hour}:15:00', 'view': view, 'path': path,
+                                       'ms': ms}) + '\n')
+        out = StringIO()
+        call_command('query_access_log', 'views-per-hour', file=self.file_name, stdout=out)
+        self.assertEqual(out.getvalue().split(), ['2021-06-01T10:00', 'user-page', '2',
+                                                  '2021-06-01T11:00', 'select-tasks', '1'])
+        out = StringIO()
+        call_command('query_access_log', 'slowest-paths', file=self.file_name, limit=1, stdout=out)
+        self.assertIn('/user/select-tasks/', out.getvalue())
+        self.assertNotIn('/user/\n', out.getvalue())
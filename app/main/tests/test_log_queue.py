@@ -0,0 +1,59 @@
+import logging
+import threading
+from logging.handlers import QueueHandler
+from types import SimpleNamespace
+from django.test import SimpleTestCase, RequestFactory
+
+from main.log_queue import QueueListenerHandler
+from main.views import decorator_adds_user_information_log
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record, threading.current_thread()))
+
+
+class QueueListenerHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.target = RecordingHandler()
+        self.handler = QueueListenerHandler([self.target])
+        self.logger = logging.getLogger('main.tests.view')
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.propagate = True
+        self.logger.setLevel(logging.NOTSET)
+        self.handler.close()
+
+    def test_records_are_written_off_the_request_thread(self):
+        def view(request):
+            return 'response'
+        view.__module__ = 'main.tests.view'
+        request = RequestFactory().get('/user/?page=2')
+        request.user = SimpleNamespace(id=7)
+        self.assertEqual(decorator_adds_user_information_log(view)(request), 'response')
+        self.handler.stop()
+        [(record, thread)] = self.target.records
+        self.assertEqual(record.getMessage(), 'A user with id=7 turned to /user/?page=2')
+        self.assertIsNot(thread, threading.current_thread())
+
+    def test_disabled_level_skips_formatting(self):
+        def view(request):
+            return 'response'
+        view.__module__ = 'main.tests.view'
+        self.logger.setLevel(logging.WARNING)
+        request = SimpleNamespace(user=SimpleNamespace(id=7), get_full_path=lambda: self.fail('path was built'))
+        decorator_adds_user_information_log(view)(request)
+        self.handler.stop()
+        self.assertEqual(self.target.records, [])
+
+    def test_is_not_configured_by_dictconfig_as_queue_handler(self):
+        # dictConfig в Python 3.12+ ожидает у наследников QueueHandler имена обработчиков, а не ссылки cfg://
+        self.assertNotIsInstance(self.handler, QueueHandler)
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.metrics import Histogram, TIME_BOUNDS, QUERY_BOUNDS, record, get_summary, reset
+from user.models import User, Company, Department, Project, Task
+
+
+class HistogramTest(SimpleTestCase):
+    def test_percentiles_within_bucket_error(self):
+        histogram = Histogram(TIME_BOUNDS)
+        for value in range(1, 1001):
+            histogram.add(value)
+        for percent, expected in [(50, 500), (95, 950), (99, 990)]:
+            self.assertAlmostEqual(histogram.percentile(percent), expected, delta=expected * 0.2)
+        self.assertEqual(histogram.percentile(100), 1000)
+        self.assertEqual(histogram.count, 1000)
+
+    def test_small_counts_within_one_bucket(self):
+        histogram = Histogram(QUERY_BOUNDS)
+        for value in [3] * 90 + [12] * 10:
+            histogram.add(value)
+        self.assertAlmostEqual(histogram.percentile(50), 3, delta=1)
+        self.assertAlmostEqual(histogram.percentile(99), 12, delta=1)
+        self.assertLessEqual(histogram.percentile(99), 12)
+
+    def test_empty(self):
+        self.assertIsNone(Histogram(TIME_BOUNDS).percentile(50))
+
+
+class RegistryTest(SimpleTestCase):
+    def setUp(self):
+        reset()
+
+    def tearDown(self):
+        reset()
+
+    def test_summary_sorted_by_p95(self):
+        for i in range(10):
+            record('user-page', 5, 1, 3)
+            record('select-tasks', 50 + i, 20, 4)
+        rows = get_summary()
+        self.assertEqual([row['view'] for row in rows], ['select-tasks', 'user-page'])
+        self.assertEqual(rows[1]['count'], 10)
+        self.assertEqual(rows[1]['queries'][2], 3)
+
+
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(name='company1')
+        department = Department.objects.create(name='department1', company=company)
+        project = Project.objects.create(name='project1', company=company)
+        cls.director = User.objects.create_user(first_name='Sarah', last_name='Connor', email='SarahConnor@email.com',
+                                                department=department, post='leader', role=2, password='12345678')
+        cls.user = User.objects.create_user(first_name='John', last_name='Connor', email='JohnConnor@email.com',
+                                            department=department, post='soldier', role=3, password='12345678')
+        Task.objects.create(user=cls.user, project=project, time_worked=60, date='2021-05-20', description='task')
+
+    def setUp(self):
+        reset()
+
+    def tearDown(self):
+        reset()
+
+    def test_counts_queries_of_streamed_response(self):
+        self.client.force_login(self.director)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(reverse('users-data-selection'), {
+                'start_date': '01/05/2021', 'end_date': '31/05/2021', 'users': [self.user.id], 'uploading_data': 2})
+            self.assertEqual(get_summary(), [])
+            self.assertIn(b'John;Connor;2021-05-20', b''.join(resp.streaming_content))
+        [row] = get_summary()
+        self.assertEqual(row['view'], 'users-data-selection')
+        self.assertEqual(row['queries'][0], len(queries))
@@ -0,0 +1,61 @@
+from django.test import TestCase
+from django.utils import timezone
+from user.models import User, Department, Company, Project, Task
+from main.pagination import get_keyset_page
+from datetime import date, timedelta
+
+
+class PaginationTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.company = Company.objects.create(name="Abc")
+        cls.department = Department.objects.create(name="abc", company=cls.company)
+        cls.project = Project.objects.create(name="abc", company=cls.company)
+        cls.test_user = User.objects.create(password="", email="abc@mail.ru", role=3, first_name="abc",
+                                            last_name="abc", date_joined=timezone.now(), post="user",
+                                            department=cls.department)
+        Task.objects.bulk_create([Task(date=date(2021, 5, 1) + timedelta(days=i // 2), time_worked=60,
+                                       description="abc", project=cls.project, user=cls.test_user)
+                                  for i in range(7)])
+        cls.tasks = list(Task.objects.filter(user=cls.test_user).order_by("date", "id"))
+
+    @classmethod
+    def tearDownClass(cls):
+        Task.objects.filter(user=cls.test_user).delete()
+        for elem in [cls.test_user, cls.project, cls.department, cls.company]:
+            elem.delete()
+
+    def test_pages_forward_and_backward(self):
+        queryset = Task.objects.filter(user=self.test_user)
+        first = get_keyset_page(queryset, ("date", "id"), page_size=3)
+        self.assertEqual(first.items, self.tasks[:3])
+        self.assertEqual((first.has_previous, first.has_next), (False, True))
+
+        second = get_keyset_page(queryset, ("date", "id"), after=first.next_cursor, page_size=3)
+        self.assertEqual(second.items, self.tasks[3:6])
+        self.assertEqual((second.has_previous, second.has_next), (True, True))
+
+        last = get_keyset_page(queryset, ("date", "id"), after=second.next_cursor, page_size=3)
+        self.assertEqual(last.items, self.tasks[6:])
+        self.assertFalse(last.has_next)
+
+        previous = get_keyset_page(queryset, ("date", "id"), before=last.previous_cursor, page_size=3)
+        self.assertEqual(previous.items, self.tasks[3:6])
+        self.assertEqual((previous.has_previous, previous.has_next), (True, True))
+
+        previous = get_keyset_page(queryset, ("date", "id"), before=previous.previous_cursor, page_size=3)
+        self.assertEqual(previous.items, self.tasks[:3])
+        self.assertFalse(previous.has_previous)
+
+    def test_invalid_cursor_returns_first_page(self):
+        queryset = Task.objects.filter(user=self.test_user)
+        for cursor in ["abc", '["2021-13-01", "1"]', '["1", "2", "3"]', '{"a": 1}', "[null, 1]"]:
+            page = get_keyset_page(queryset, ("date", "id"), after=cursor, page_size=3)
+            self.assertEqual(page.items, self.tasks[:3])
+
+    def test_number_of_queries_does_not_depend_on_depth(self):
+        queryset = Task.objects.filter(user=self.test_user)
+        with self.assertNumQueries(1):
+            get_keyset_page(queryset, ("date", "id"), after=f'["{self.tasks[5].date}", "{self.tasks[5].id}"]',
+                            page_size=3)
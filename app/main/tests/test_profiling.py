@@ -0,0 +1,51 @@
+import os
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from main.profiling import get_profile_names
+from user.models import User, Company, Department
+
+
+class ProfilingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='department1', company=Company.objects.create(name='company1'))
+        cls.admin = User.objects.create_user(first_name='admin', last_name='admin', email='admin@email.com',
+                                             department=department, post='admin', role=1, password='12345678')
+        cls.director = User.objects.create_user(first_name='director', last_name='director', email='d@email.com',
+                                                department=department, post='director', role=2, password='12345678')
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(PROFILES_DIR=self.directory.name, PROFILES_KEEP=2)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_profiles_requests_of_administrator(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse('administrator-page'), {'profile': 1})
+        name = resp['X-Profile-ID']
+        self.assertEqual(get_profile_names(), [name])
+        with open(os.path.join(self.directory.name, f'{name}.txt'), encoding='utf-8') as file:
+            table = file.read()
+        self.assertIn('view: administrator-page', table)
+        self.assertIn('cumulative', table)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory.name, f'{name}.prof')))
+
+    def test_header_trigger_and_keeps_latest_profiles(self):
+        self.client.force_login(self.admin)
+        for request_id in ['a', 'b', 'c']:
+            self.client.get(reverse('administrator-page'), HTTP_X_PROFILE='1', HTTP_X_REQUEST_ID=request_id)
+        self.assertEqual([name[-1] for name in get_profile_names()], ['c', 'b'])
+        self.assertEqual(len(os.listdir(self.directory.name)), 4)
+
+    def test_ignores_flag_of_other_roles_and_plain_requests(self):
+        self.client.force_login(self.director)
+        self.assertNotIn('X-Profile-ID', self.client.get(reverse('director-page'), {'profile': 1}))
+        self.client.force_login(self.admin)
+        self.assertNotIn('X-Profile-ID', self.client.get(reverse('administrator-page')))
+        self.assertEqual(get_profile_names(), [])
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from main.prometheus import render_metrics
+from user.models import User, Company, Department, Project, Task
+
+
+class MetricsEndpointTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='department1', company=Company.objects.create(name='company1'))
+        cls.user = User.objects.create_user(first_name='John', last_name='Connor', email='JohnConnor@email.com',
+                                            department=department, post='leader', role=3, password='12345678')
+
+    def get_requests(self):
+        return REGISTRY.get_sample_value('app_requests_total', {'view': 'user-page', 'method': 'GET', 'status': '200'})
+
+    def test_counts_requests_and_queries(self):
+        self.client.force_login(self.user)
+        before = self.get_requests() or 0
+        self.client.get(reverse('user-page'))
+        self.client.get(reverse('user-page'))
+        self.assertEqual(self.get_requests(), before + 2)
+        resp = self.client.get(reverse('metrics'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp['Content-Type'].startswith('text/plain'))
+        text = resp.content.decode()
+        self.assertIn('app_requests_total{method="GET",status="200",view="user-page"}', text)
+        self.assertIn('app_request_duration_seconds_bucket{le="0.005",view="user-page"}', text)
+        self.assertIn('app_db_queries_total{view="user-page"}', text)
+
+    def test_counts_queries_of_streamed_export(self):
+        project = Project.objects.create(name='project1', company=self.user.department.company)
+        Task.objects.create(user=self.user, project=project, time_worked=60, date='2021-05-20', description='task')
+        director = User.objects.create_user(first_name='Sarah', last_name='Connor', email='SarahConnor@email.com',
+                                            department=self.user.department, post='leader', role=2, password='1')
+        self.client.force_login(director)
+        labels = {'view': 'users-data-selection'}
+        before = REGISTRY.get_sample_value('app_db_queries_total', labels) or 0
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(reverse('users-data-selection'), {
+                'start_date': '01/05/2021', 'end_date': '31/05/2021', 'users': [self.user.id], 'uploading_data': 2})
+            b''.join(resp.streaming_content)
+        self.assertEqual(REGISTRY.get_sample_value('app_db_queries_total', labels), before + len(queries))
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requires_token_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        resp = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(resp.status_code, 200)
+
+
+class MultiprocessModeTest(TestCase):
+    def test_aggregates_counters_of_all_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory, 'PYTHONPATH': str(settings.BASE_DIR)}
+            for result in ['sent', 'sent', 'failed']:
+                subprocess.run([sys.executable, '-c', 'from main.prometheus import invitation_emails_total; '
+                                                      f'invitation_emails_total.labels("{result}").inc()'],
+                               env=env, check=True)
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                text = render_metrics().decode()
+        self.assertIn('app_invitation_emails_total{result="sent"} 2.0', text)
+        self.assertIn('app_invitation_emails_total{result="failed"} 1.0', text)
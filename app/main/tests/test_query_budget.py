@@ -0,0 +1,196 @@
+import logging
+import os
+from itertools import count
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from administrator.models import UnregisteredUser
+from director.models import ExportJob
+from user.models import User, Company, Department, Project, Task
+
+start_date, end_date = date(2021, 5, 1), date(2021, 5, 31)
+day = date(2021, 5, 20)
+selection = {'start_date': '01/05/2021', 'end_date': '31/05/2021'}
+
+
+def seed(number: int, users_per_department: int, tasks_per_user: int):
+    """Компании с отделами, проектами, сотрудниками и их заданиями за май 2021"""
+    for c in range(2):
+        company = Company.objects.create(name=f'company{number}-{c}')
+        projects = [Project.objects.create(name=f'project{number}-{c}-{p}', company=company) for p in range(3)]
+        for d in range(2):
+            department = Department.objects.create(name=f'department{number}-{c}-{d}', company=company)
+            department.project.set(projects)
+            seed_users(department, projects, f'{number}-{c}-{d}', users_per_department, tasks_per_user)
+
+
+def seed_users(department, projects, prefix: str, count: int, tasks_per_user: int):
+    """Сотрудники отдела с заданиями, распределенными по дням и проектам"""
+    users = [User.objects.create(email=f'user{prefix}-{u}@email.com', first_name=f'first{u}', last_name=f'last{u}',
+                                 department=department, post='worker', role=3) for u in range(count)]
+    Task.objects.bulk_create([Task(user=user, project=projects[t % len(projects)], time_worked=30 + t,
+                                   date=start_date + timedelta(days=t % 31), description=f'task {t}')
+                              for user in users for t in range(tasks_per_user)])
+    return users
+
+
+@override_settings(PAGE_SIZE=20)
+class QueryBudgetTest(TestCase):
+    """Число запросов каждой страницы ограничено и не зависит от объема данных"""
+    numbers = count(2)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='company')
+        cls.projects = [Project.objects.create(name=f'project{p}', company=cls.company) for p in range(3)]
+        cls.department = Department.objects.create(name='department', company=cls.company)
+        cls.department.project.set(cls.projects)
+        cls.admin = User.objects.create_user(email='admin@email.com', password='12345678', role=1, post='admin',
+                                             department=cls.department, first_name='admin', last_name='admin')
+        cls.director = User.objects.create_user(email='director@email.com', password='12345678', role=2,
+                                                post='director', department=cls.department,
+                                                first_name='director', last_name='director')
+        cls.user = User.objects.create_user(email='user@email.com', password='12345678', role=3, post='worker',
+                                            department=cls.department, first_name='user', last_name='user')
+        cls.task = Task.objects.create(user=cls.user, project=cls.projects[0], time_worked=60, date=day,
+                                       description='task')
+        seed(1, users_per_department=5, tasks_per_user=30)
+        cls.grow(1)
+
+    @classmethod
+    def grow(cls, number: int):
+        """Добавляет данные на каждой странице: задания, сотрудников, компании, выгрузки и приглашения"""
+        Task.objects.bulk_create([Task(user=cls.user, project=cls.projects[t % 3], time_worked=30 + t,
+                                       date=start_date + timedelta(days=t % 31), description=f'task {t}')
+                                  for t in range(40)])
+        users = seed_users(cls.department, cls.projects, f'{number}', 10, 20)
+        seed(number + 10, users_per_department=3, tasks_per_user=10)
+        for file_format in (2, 3):
+            job = ExportJob.objects.create(director=cls.director, start_date=start_date, end_date=end_date,
+                                           file_format=file_format, status=ExportJob.DONE, rows_total=10,
+                                           rows_written=10)
+            job.users.set(users)
+        UnregisteredUser.objects.bulk_create([UnregisteredUser(
+            first_name='new', last_name='user', email=f'new{number}-{i}@email.com', department=cls.department,
+            post='worker', code=f'{number:02d}{i:06d}') for i in range(20)])
+        call_command('rebuild_task_totals', stdout=StringIO())
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(PROFILES_DIR=self.directory.name,
+                                                   EXPORT_FILES_DIR=self.directory.name)
+        self.settings_override.enable()
+        self.access_logger = logging.getLogger('access')
+        self.access_level = self.access_logger.level
+        self.access_logger.setLevel(logging.INFO)
+        self.job = ExportJob.objects.create(director=self.director, start_date=start_date, end_date=end_date,
+                                            file_format=2, status=ExportJob.DONE, rows_total=1, rows_written=1,
+                                            file_path=os.path.join(self.directory.name, 'export.csv'),
+                                            expires_at=day.replace(year=3000))
+        with open(self.job.file_path, 'w') as file:
+            file.write('data')
+
+    def tearDown(self):
+        self.access_logger.setLevel(self.access_level)
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def count_queries(self, user, url, data=None):
+        """Число запросов к БД при обработке одного запроса, включая чтение потокового ответа"""
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(url, data) if data is not None else self.client.get(url)
+            self.assertLess(resp.status_code, 400, url)
+            if resp.streaming:
+                b''.join(resp.streaming_content)
+            resp.close()
+        return len(queries)
+
+    def assertBudget(self, budget: int, user, get_url, data=None):
+        """Проверяет, что страница укладывается в budget запросов и до, и после увеличения объема данных"""
+        before = self.count_queries(user, get_url(), data)
+        type(self).grow(next(self.numbers))
+        after = self.count_queries(user, get_url(), data)
+        self.assertEqual(before, after, f'{get_url()} depends on the number of rows: {before} -> {after}')
+        self.assertLessEqual(after, budget, f'{get_url()} exceeds its budget of {budget} queries')
+
+    def test_public_pages(self):
+        self.assertBudget(0, self.user, lambda: reverse('login'))
+        self.assertBudget(0, self.user, lambda: reverse('registration'))
+        self.assertBudget(2, self.user, lambda: reverse('home'))
+        self.assertBudget(0, self.user, lambda: reverse('metrics'))
+
+    def test_user_pages(self):
+        self.assertBudget(3, self.user, lambda: reverse('user-page'), {'year': 2021, 'month': 'May'})
+        self.assertBudget(3, self.user, lambda: reverse('list-tasks', args=[2021, 5, 20]))
+        self.assertBudget(3, self.user, lambda: reverse('create-task', args=[2021, 5, 20]))
+        self.assertBudget(4, self.user, lambda: reverse('edit-task', args=[self.task.id]))
+        self.assertBudget(2, self.user, lambda: reverse('select-tasks'))
+        self.assertBudget(3, self.user, lambda: reverse('select-tasks'), selection)
+        self.assertBudget(2, self.user, lambda: reverse('change-data'))
+        self.assertBudget(2, self.user, lambda: reverse('change-password'))
+
+    def test_user_task_changes(self):
+        self.assertBudget(10, self.user, lambda: reverse('create-task', args=[2021, 5, 20]),
+                          {'project': self.projects[0].id, 'time_worked': 60, 'description': 'new'})
+        self.assertBudget(11, self.user, lambda: reverse('edit-task', args=[self.task.id]),
+                          {'project': self.projects[1].id, 'time_worked': 90, 'description': 'edited'})
+        self.assertBudget(10, self.user, lambda: reverse('delete-task', args=[Task.objects.create(
+            user=self.user, project=self.projects[0], time_worked=60, date=day, description='spare').id]))
+
+    def test_director_pages(self):
+        users = lambda: {**selection, 'users': list(User.objects.filter(department=self.department, role=3)
+                                                    .values_list('id', flat=True))}
+        self.assertBudget(3, self.director, lambda: reverse('director-page'))
+        self.assertBudget(5, self.director, lambda: reverse('user-data', args=[self.user.id]))
+        self.assertBudget(3, self.director, lambda: reverse('users-data-selection'))
+        for uploading_data in (1, 2, 3, 4):
+            self.assertBudget(4, self.director, lambda: reverse('users-data-selection'),
+                              {**users(), 'uploading_data': uploading_data})
+        self.assertBudget(4, self.director, lambda: reverse('users-data-selection'),
+                          {**users(), 'uploading_data': 1, 'report': 'week'})
+        self.assertBudget(6, self.director, lambda: reverse('users-data-selection'),
+                          {**users(), 'uploading_data': 2, 'in_background': 'on'})
+        self.assertBudget(3, self.director, lambda: reverse('export-jobs'))
+        self.assertBudget(3, self.director, lambda: reverse('download-export', args=[self.job.id]))
+
+    def test_administrator_pages(self):
+        self.assertBudget(5, self.admin, lambda: reverse('administrator-page'))
+        self.assertBudget(4, self.admin, lambda: reverse('user', args=[self.user.id]))
+        self.assertBudget(3, self.admin, lambda: reverse('invitation'))
+        self.assertBudget(3, self.admin, lambda: reverse('bulk-invitation'))
+        self.assertBudget(2, self.admin, lambda: reverse('administrator-metrics'))
+        self.assertBudget(2, self.admin, lambda: reverse('slow-queries'))
+        self.assertBudget(2, self.admin, lambda: reverse('profiles'))
+        name = self.client.get(reverse('administrator-page'), HTTP_X_PROFILE='1')['X-Profile-ID']
+        self.assertBudget(2, self.admin, lambda: reverse('profile', args=[name]))
+        self.assertBudget(2, self.admin, lambda: reverse('download-profile', args=[name]))
+        self.assertBudget(11, self.admin, lambda: reverse('delete-user', args=[User.objects.create_user(
+            email=f'spare{User.objects.count()}@email.com', password='1', role=3, department=self.department).id]))
+
+    def test_company_pages(self):
+        self.assertBudget(3, self.admin, lambda: reverse('company-list'))
+        self.assertBudget(3, self.admin, lambda: reverse('edit-company', args=[self.company.id]))
+        self.assertBudget(2, self.admin, lambda: reverse('add-company'))
+        self.assertBudget(4, self.admin, lambda: reverse('department-list', args=[self.company.id]))
+        self.assertBudget(6, self.admin, lambda: reverse('edit-department', args=[self.company.id,
+                                                                                   self.department.id]))
+        self.assertBudget(4, self.admin, lambda: reverse('add-department', args=[self.company.id]))
+        self.assertBudget(4, self.admin, lambda: reverse('project-list', args=[self.company.id]))
+        self.assertBudget(5, self.admin, lambda: reverse('edit-project', args=[self.company.id,
+                                                                                self.projects[0].id]))
+        self.assertBudget(4, self.admin, lambda: reverse('add-project', args=[self.company.id]))
+
+    def test_company_deletions(self):
+        self.assertBudget(7, self.admin, lambda: reverse('delete-project', args=[
+            self.company.id, Project.objects.create(name='spare', company=self.company).id]))
+        self.assertBudget(8, self.admin, lambda: reverse('delete-department', args=[
+            self.company.id, Department.objects.create(name='spare', company=self.company).id]))
+        self.assertBudget(6, self.admin, lambda: reverse('delete-company', args=[
+            Company.objects.create(name='spare').id]))
@@ -0,0 +1,49 @@
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from main.slow_queries import get_fingerprint, get_slow_queries, clear
+from user.models import User, Company, Department
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_strips_parameters_and_literals(self):
+        self.assertEqual(get_fingerprint('SELECT "user_task"."id" FROM "user_task"\n  WHERE "user_task"."user_id" = %s '
+                                         'AND "user_task"."date" > \'2021-06-01\' LIMIT 21'),
+                         'SELECT "user_task"."id" FROM "user_task" WHERE "user_task"."user_id" = ? '
+                         'AND "user_task"."date" > ? LIMIT ?')
+
+    def test_collapses_in_lists(self):
+        self.assertEqual(get_fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+                         get_fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'))
+
+
+class SlowQueryCaptureTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='department1', company=Company.objects.create(name='company1'))
+        cls.user = User.objects.create_user(first_name='John', last_name='Connor', email='JohnConnor@email.com',
+                                            department=department, post='leader', role=3, password='12345678')
+
+    def setUp(self):
+        clear()
+
+    def tearDown(self):
+        clear()
+
+    def test_ignores_fast_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('user-page'))
+        self.assertEqual(get_slow_queries(), [])
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_captures_queries_with_view_and_request_id(self):
+        self.client.force_login(self.user)
+        with self.assertLogs('slow_queries', 'WARNING') as logs:
+            resp = self.client.get(reverse('user-page'), HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual(resp['X-Request-ID'], 'abc-123')
+        queries = get_slow_queries()
+        self.assertEqual(len(logs.records), len(queries))
+        self.assertTrue(queries)
+        self.assertTrue(all(query['request_id'] == 'abc-123' for query in queries))
+        self.assertEqual(queries[0]['view'], 'user-page')
+        self.assertNotIn('%s', ''.join(query['sql'] for query in queries))
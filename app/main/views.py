@@ -1,14 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.utils.crypto import constant_time_compare
+from prometheus_client import CONTENT_TYPE_LATEST
+from main.prometheus import render_metrics
 
 import logging
 
 
 def decorator_adds_user_information_log(func):
     """Добавляет информацию к какому url-адрессу обратился пользователь в журнал"""
+    logger = logging.getLogger(func.__module__)
+
     def wrapped(request, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        logger.info(f"A user with id={request.user.id} turned to {request.get_full_path()}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("A user with id=%s turned to %s", request.user.id, request.get_full_path())
         return func(request, **kwargs)
     return wrapped
 
@@ -22,3 +29,11 @@ def index(request):
         return redirect("director-page")
     else:
         return redirect("administrator-page")
+
+
+def metrics(request):
+    """Метрики приложения в текстовом формате Prometheus"""
+    if settings.METRICS_TOKEN and not constant_time_compare(request.headers.get("Authorization", ""),
+                                                            f"Bearer {settings.METRICS_TOKEN}"):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
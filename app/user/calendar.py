@@ -1,15 +1,25 @@
 from datetime import date
 from calendar import monthrange
-from holidays import Belarus
+from functools import lru_cache
+import holidays
 
 years = [year for year in range(date.today().year, 2009, -1)]
 months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+holidays_country = "Belarus"
 
 
 class Day:
-    """Класс, описывающий день"""
-    def __init__(self, num: int, is_working_day: bool = True):
+    """Класс, описывающий день (экземпляры из кэша сетки месяца общие, их нельзя изменять)"""
+    __slots__ = ("num", "is_working_day", "time_worked", "task_count")
+
+    def __init__(self, num: int, is_working_day: bool = True, time_worked: int = 0, task_count: int = 0):
         self.num, self.is_working_day = num, is_working_day
+        self.time_worked, self.task_count = time_worked, task_count
+
+    @property
+    def hours_worked(self) -> float:
+        """Отработанное за день время в часах"""
+        return self.time_worked / 60
 
     def __str__(self):
         return f"Day: {self.num} - {'workday' if self.is_working_day else 'weekend'}"
@@ -18,21 +28,48 @@ class Day:
         return self.__str__()
 
 
+@lru_cache(maxsize=64)
+def get_holidays_year(year: int, country: str = holidays_country) -> frozenset:
+    """Праздничные дни страны за год в виде множества порядковых номеров дней года (вычисляется один раз)"""
+    return frozenset(day.timetuple().tm_yday for day in getattr(holidays, country)(years=year) if day.year == year)
+
+
+def preload_holidays(years_list: list, country: str = holidays_country):
+    """Заранее вычисляет праздничные дни для переданных лет"""
+    for year in years_list:
+        get_holidays_year(year, country)
+
+
+def is_public_holiday(year: int, month: int, day: int) -> bool:
+    """Проверяет, является ли день праздничным в Республике Беларусь"""
+    return date(year, month, day).timetuple().tm_yday in get_holidays_year(year)
+
+
+def is_working_day(year: int, month: int, day: int) -> bool:
+    """Проверяет, является ли день рабочим"""
+    return date(year, month, day).weekday() not in [5, 6] and not is_public_holiday(year, month, day)
+
+
 def get_public_holidays(year: int, month: int) -> list:
     """Получаем праздничные дни в Республике Беларусь"""
-    return [elem[0].day for elem in Belarus(years=year).items() if elem[0].month == month]
-
+    first_day = date(year, month, 1).timetuple().tm_yday
+    year_holidays = get_holidays_year(year)
+    return [num for num in range(1, monthrange(year, month)[1] + 1) if first_day + num - 1 in year_holidays]
 
-def get_all_weeks_month(year: int, month: int) -> list:
-    """Распределяет дни месяца по неделям"""
-    days = [Day(num, False if date(year, month, num).weekday() in [5, 6] or num in get_public_holidays(year, month)
-                else True) for num in range(1, monthrange(year, month)[1] + 1)]
 
+@lru_cache(maxsize=256)
+def get_month_grid(year: int, month: int) -> tuple:
+    """Неизменяемая сетка месяца: кортеж недель, в первой неделе дни до начала месяца - None"""
+    days = tuple(Day(num, is_working_day(year, month, num)) for num in range(1, monthrange(year, month)[1] + 1))
     day_week = date(year, month, 1).weekday()
-    weeks = [[None for i in range(0, day_week)] + [days.pop(0) for _ in range(day_week, 7)]]
+    first_week = (None,) * day_week + days[:7 - day_week]
+    return (first_week,) + tuple(days[start:start + 7] for start in range(7 - day_week, len(days), 7))
 
-    while len(days) != 0:
-        weeks.append(days[:7])
-        del days[:7]
 
-    return weeks
+def get_all_weeks_month(year: int, month: int, totals: dict = None) -> tuple:
+    """Распределяет дни месяца по неделям, totals - {номер дня: (отработанное время, количество заданий)}"""
+    weeks = get_month_grid(year, month)
+    if not totals:
+        return weeks
+    return tuple(tuple(Day(day.num, day.is_working_day, *totals[day.num])
+                       if day is not None and day.num in totals else day for day in week) for week in weeks)
@@ -0,0 +1,52 @@
+from timeit import timeit
+from datetime import date
+from calendar import monthrange
+from django.core.management.base import BaseCommand
+from holidays import Belarus
+from user.calendar import Day, get_all_weeks_month, get_month_grid, get_holidays_year
+
+
+def legacy_get_all_weeks_month(year: int, month: int) -> list:
+    """Прежняя реализация: календарь праздников и сетка строятся заново при каждом отображении"""
+    def get_public_holidays(year, month):
+        return [elem[0].day for elem in Belarus(years=year).items() if elem[0].month == month]
+
+    days = [Day(num, False if date(year, month, num).weekday() in [5, 6] or num in get_public_holidays(year, month)
+                else True) for num in range(1, monthrange(year, month)[1] + 1)]
+
+    day_week = date(year, month, 1).weekday()
+    weeks = [[None for i in range(0, day_week)] + [days.pop(0) for _ in range(day_week, 7)]]
+
+    while len(days) != 0:
+        weeks.append(days[:7])
+        del days[:7]
+
+    return weeks
+
+
+class Command(BaseCommand):
+    """Измеряет стоимость построения календаря месяца до и после кэширования"""
+    help = "Measures the per-render cost of the month calendar grid"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=date.today().year)
+        parser.add_argument("--month", type=int, default=date.today().month)
+        parser.add_argument("--number", type=int, default=1000, help="renders per measurement")
+
+    def handle(self, *args, **options):
+        year, month, number = options["year"], options["month"], options["number"]
+        totals = {1: (480, 2), 15: (240, 1)}
+
+        def cold():
+            get_month_grid.cache_clear()
+            get_holidays_year.cache_clear()
+            return get_all_weeks_month(year, month, totals)
+
+        results = [
+            ("legacy (holidays per day)", timeit(lambda: legacy_get_all_weeks_month(year, month), number=number)),
+            ("grid built from scratch", timeit(cold, number=number)),
+            ("cached grid", timeit(lambda: get_all_weeks_month(year, month), number=number)),
+            ("cached grid + day totals", timeit(lambda: get_all_weeks_month(year, month, totals), number=number)),
+        ]
+        for name, seconds in results:
+            self.stdout.write(f"{name:<28} {seconds / number * 1e6:10.2f} us/render")
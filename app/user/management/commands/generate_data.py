@@ -0,0 +1,151 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from user.calendar import is_working_day
+from user.models import User, Company, Department, Project, Task
+
+first_names = ["Ivan", "Anna", "Pavel", "Olga", "Sergei", "Maria", "Dmitry", "Elena", "Alexei", "Natalia",
+               "Andrei", "Irina", "Maxim", "Tatiana", "Nikita", "Yulia"]
+last_names = ["Ivanov", "Petrov", "Sidorov", "Kovalenko", "Novik", "Kozlov", "Lebedev", "Morozov", "Volkov",
+              "Sokolov", "Popov", "Orlov", "Zaitsev", "Pavlov"]
+posts = ["developer", "tester", "analyst", "designer", "engineer", "support"]
+activities = ["Implementation of", "Code review of", "Testing of", "Meeting about", "Documentation for",
+              "Bug fixing in", "Design of", "Deployment of"]
+subjects = ["the reporting module", "the user calendar", "data export", "the invitation flow", "the API",
+            "database migrations", "the admin pages", "performance tuning"]
+chunk_size = 10000
+
+
+def create_all(model, objects: list, key: str) -> list:
+    """bulk_create, дополняющий первичные ключи повторной выборкой по уникальному полю там, где БД их не возвращает"""
+    model.objects.bulk_create(objects, batch_size=1000)
+    if objects and objects[0].pk is None:
+        values = [getattr(obj, key) for obj in objects]
+        ids = {}
+        for start in range(0, len(values), 1000):
+            ids.update(model.objects.filter(**{f"{key}__in": values[start:start + 1000]}).values_list(key, "id"))
+        for obj in objects:
+            obj.pk = ids[getattr(obj, key)]
+    return objects
+
+
+def get_working_days(start: date, end: date) -> list:
+    """Рабочие дни периода"""
+    days = (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+    return [day for day in days if is_working_day(day.year, day.month, day.day)]
+
+
+def generate_tasks(rng, members: list, days: list, count: int):
+    """Задания в виде кортежей (дата, минуты, проект, пользователь, описание); активность пользователей
+    распределена логнормально, проекты отдела выбираются с убывающими весами, время - кратно 15 минутам"""
+    cum_weights = list(accumulate(rng.lognormvariate(0, 0.6) for _ in members))
+    project_weights = {len(projects): list(accumulate(range(len(projects), 0, -1))) for _, projects in members}
+    generated = 0
+    while generated < count:
+        size = min(chunk_size, count - generated)
+        for user_id, projects in rng.choices(members, cum_weights=cum_weights, k=size):
+            project_id = rng.choices(projects, cum_weights=project_weights[len(projects)])[0]
+            minutes = max(15, round(rng.triangular(15, 480, 120) / 15) * 15)
+            yield (rng.choice(days), minutes, project_id, user_id,
+                   f"{rng.choice(activities)} {rng.choice(subjects)}")
+        generated += size
+
+
+def copy_tasks(rows: list):
+    """Загружает пакет заданий командой COPY PostgreSQL"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = ", ".join(Task._meta.get_field(name).column
+                        for name in ("date", "time_worked", "project", "user", "description"))
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY "{Task._meta.db_table}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def insert_tasks(rows: list):
+    """Загружает пакет заданий через bulk_create"""
+    Task.objects.bulk_create([Task(date=day, time_worked=minutes, project_id=project_id, user_id=user_id,
+                                   description=description)
+                              for day, minutes, project_id, user_id, description in rows])
+
+
+class Command(BaseCommand):
+    """Генерирует компании, отделы, проекты, сотрудников и задания для нагрузочного тестирования"""
+    help = "Generates deterministic synthetic companies, departments, projects, users and tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=2)
+        parser.add_argument("--departments", type=int, default=3, help="departments per company")
+        parser.add_argument("--projects", type=int, default=5, help="projects per company")
+        parser.add_argument("--users", type=int, default=20, help="users per department")
+        parser.add_argument("--tasks", type=int, default=10000, help="total number of tasks")
+        parser.add_argument("--start", type=date.fromisoformat, default=date(2021, 1, 1),
+                            help="first day of tasks; fixed by default so that runs on different days match")
+        parser.add_argument("--end", type=date.fromisoformat, default=date(2021, 12, 31))
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=50000, help="tasks per insert")
+        parser.add_argument("--password", default="12345678", help="password of every generated user")
+        parser.add_argument("--no-copy", action="store_true", help="use bulk_create even on PostgreSQL")
+
+    def handle(self, *args, **options):
+        if min(options["companies"], options["departments"], options["projects"], options["users"],
+               options["batch_size"]) < 1 or options["tasks"] < 0:
+            raise CommandError("counts must be positive")
+        days = get_working_days(options["start"], options["end"])
+        if not days:
+            raise CommandError("the date range has no working days")
+        rng = random.Random(options["seed"])
+        prefix = f"s{options['seed']}"
+        if User.objects.filter(email__startswith=f"{prefix}.").exists():
+            raise CommandError(f"data for seed {options['seed']} has already been generated")
+
+        with transaction.atomic():
+            companies = create_all(Company, [Company(name=f"{prefix} company {c}")
+                                             for c in range(options["companies"])], "name")
+            projects = create_all(Project, [Project(name=f"{prefix} project {c}-{p}", company=company)
+                                            for c, company in enumerate(companies)
+                                            for p in range(options["projects"])], "name")
+            departments = create_all(Department, [Department(name=f"{prefix} department {c}-{d}", company=company)
+                                                  for c, company in enumerate(companies)
+                                                  for d in range(options["departments"])], "name")
+            company_projects = {company.pk: [project for project in projects if project.company_id == company.pk]
+                                for company in companies}
+            department_projects, links = {}, []
+            for department in departments:
+                own = company_projects[department.company_id]
+                department_projects[department.pk] = rng.sample(own, rng.randint(min(2, len(own)), len(own)))
+                links += [Department.project.through(department_id=department.pk, project_id=project.pk)
+                          for project in department_projects[department.pk]]
+            Department.project.through.objects.bulk_create(links, batch_size=1000)
+
+            password = make_password(options["password"])
+            users = create_all(User, [
+                User(email=f"{prefix}.{d}.{u}@example.com", password=password, department=department,
+                     role=2 if u == 0 else 3, first_name=rng.choice(first_names), last_name=rng.choice(last_names),
+                     post="director" if u == 0 else rng.choice(posts))
+                for d, department in enumerate(departments) for u in range(options["users"] + 1)], "email")
+
+        members = [(user.pk, [project.pk for project in department_projects[user.department_id]])
+                   for user in users if user.role == 3]
+        insert = copy_tasks if connection.vendor == "postgresql" and not options["no_copy"] else insert_tasks
+        batch, written = [], 0
+        for row in generate_tasks(rng, members, days, options["tasks"]):
+            batch.append(row)
+            if len(batch) == options["batch_size"]:
+                insert(batch)
+                written += len(batch)
+                batch = []
+                self.stdout.write(f"{written} tasks")
+        if batch:
+            insert(batch)
+
+        call_command("rebuild_task_totals", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(companies)} companies, {len(departments)} departments, {len(projects)} projects, "
+            f"{len(users)} users and {options['tasks']} tasks"))
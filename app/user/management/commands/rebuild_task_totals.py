@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum, Count
+from user.models import User, Task, TaskDayTotal
+
+
+class Command(BaseCommand):
+    """Пересчитывает или проверяет суммы заданий пользователей за день"""
+    help = "Rebuilds or verifies TaskDayTotal rows against the raw Task rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true", help="only report mismatching days")
+        parser.add_argument("--batch-size", type=int, default=500, help="number of users per batch")
+        parser.add_argument("--if-empty", action="store_true",
+                            help="rebuild only if there are tasks but no day totals yet (used on deploy)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        if options["if_empty"] and (TaskDayTotal.objects.exists() or not Task.objects.exists()):
+            self.stdout.write("Day totals are already filled, nothing to rebuild")
+            return
+
+        user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+        mismatches = 0
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            expected = {(row["user"], row["date"]): (row["time_worked"], row["task_count"])
+                        for row in Task.objects.filter(user__in=batch).order_by().values("user", "date").annotate(
+                            time_worked=Sum("time_worked"), task_count=Count("id"))}
+            if options["verify"]:
+                actual = {(row[0], row[1]): (row[2], row[3]) for row in TaskDayTotal.objects.filter(
+                    user__in=batch).values_list("user", "date", "time_worked", "task_count")}
+                for key in expected.keys() | actual.keys():
+                    if expected.get(key) != actual.get(key):
+                        mismatches += 1
+                        self.stdout.write(f"user={key[0]} date={key[1]}: expected {expected.get(key)}, "
+                                          f"stored {actual.get(key)}")
+            else:
+                with transaction.atomic():
+                    TaskDayTotal.objects.filter(user__in=batch).delete()
+                    TaskDayTotal.objects.bulk_create(
+                        [TaskDayTotal(user_id=user_id, date=day, time_worked=time_worked, task_count=task_count)
+                         for (user_id, day), (time_worked, task_count) in expected.items()],
+                        batch_size=batch_size)
+
+        if options["verify"]:
+            if mismatches:
+                raise CommandError(f"{mismatches} mismatching day totals")
+            self.stdout.write(self.style.SUCCESS("Day totals are consistent"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Day totals rebuilt for {len(user_ids)} users"))
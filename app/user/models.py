@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import AbstractUser
 from account.models import UserManager
 
@@ -44,6 +46,15 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['department', 'role'], name='user_department_role_idx'),
+            models.Index(fields=['role', 'last_name', 'first_name', 'id'], name='user_role_name_idx'),
+            models.Index(fields=['last_name'], name='user_last_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['first_name'], name='user_first_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['email'], name='user_email_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
 
@@ -55,3 +66,44 @@ class Task(models.Model):
     project = models.ForeignKey(Project, on_delete=models.RESTRICT)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     description = models.TextField()
+
+    class Meta:
+        ordering = ['date', 'id']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='task_user_date_idx'),
+            models.Index(fields=['date', 'project'], name='task_date_project_idx'),
+        ]
+
+
+class TaskDayTotalManager(models.Manager):
+    """Manager, поддерживающий суммы заданий за день в актуальном состоянии"""
+
+    def apply(self, user, day, time_worked, task_count):
+        """Прибавляет к сумме за день отработанное время и количество заданий (значения могут быть отрицательными);
+        суммы не опускаются ниже нуля, даже если они не учитывали задание"""
+        changes = {"time_worked": Greatest(F("time_worked") + time_worked, 0),
+                   "task_count": Greatest(F("task_count") + task_count, 0)}
+        with transaction.atomic():
+            if not self.filter(user=user, date=day).update(**changes) and task_count > 0:
+                try:
+                    with transaction.atomic():
+                        self.create(user=user, date=day, time_worked=time_worked, task_count=task_count)
+                except IntegrityError:
+                    self.filter(user=user, date=day).update(**changes)
+            if task_count < 0:
+                self.filter(user=user, date=day, task_count__lte=0).delete()
+
+
+class TaskDayTotal(models.Model):
+    """Модель, описывающая таблицу сумм заданий пользователя за день"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    time_worked = models.PositiveBigIntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+
+    objects = TaskDayTotalManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='task_day_total_user_date_uniq'),
+        ]
@@ -1,6 +1,7 @@
 from django.test import TestCase
 from datetime import date
-from user.calendar import Day, years, get_public_holidays, get_all_weeks_month
+from user.calendar import Day, years, get_public_holidays, get_all_weeks_month, get_holidays_year, \
+    is_public_holiday, is_working_day, get_month_grid
 
 
 def get_weekend_and_workday(weeks):
@@ -60,3 +61,27 @@ class CalendarTestCase(TestCase):
         weekend, workday = get_weekend_and_workday(weeks)
         self.assertEqual(len(weekend), 8)
         self.assertEqual(len(workday), 22)
+
+    def test_3_checks_distribution_days_week(self):
+        weeks = get_all_weeks_month(2021, 5, {20: (150, 2)})
+        days = {day.num: day for week in weeks for day in week if day is not None}
+        self.assertEqual((days[20].time_worked, days[20].task_count), (150, 2))
+        self.assertEqual(days[20].hours_worked, 2.5)
+        self.assertEqual((days[21].time_worked, days[21].task_count), (0, 0))
+
+    def test_checks_holidays_year_cache(self):
+        get_holidays_year.cache_clear()
+        get_public_holidays(2021, 5)
+        get_public_holidays(2021, 6)
+        self.assertTrue(is_public_holiday(2021, 5, 9))
+        self.assertFalse(is_working_day(2021, 5, 9))
+        self.assertTrue(is_working_day(2021, 5, 20))
+        info = get_holidays_year.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 3))
+
+    def test_checks_month_grid_cache(self):
+        self.assertIs(get_all_weeks_month(2021, 5), get_all_weeks_month(2021, 5))
+        self.assertIs(get_month_grid(2021, 5)[3][0], get_all_weeks_month(2021, 5, {20: (150, 2)})[3][0])
+        self.assertEqual(get_month_grid(2021, 5)[0], (None, None, None, None, None,
+                                                      get_month_grid(2021, 5)[0][5], get_month_grid(2021, 5)[0][6]))
+        self.assertFalse(hasattr(Day(1), "__dict__"))
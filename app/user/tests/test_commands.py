@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from user.models import User, Company, Department, Project, Task, TaskDayTotal
+from django.db.models import Sum
+from datetime import date
+from io import StringIO
+
+
+class RebuildTaskTotalsCommandTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.company = Company.objects.create(name="Abc")
+        cls.department = Department.objects.create(name="abc", company=cls.company)
+        cls.project = Project.objects.create(name="abc", company=cls.company)
+        cls.test_user = User.objects.create(password="", email="abc@mail.ru", role=3, is_superuser=True,
+                                            first_name="abc", last_name="abc", is_staff=1, is_active=1,
+                                            date_joined=timezone.now(), post="user", department=cls.department)
+        cls.task1 = Task.objects.create(date=date(2021, 5, 20), time_worked=120, description="abc",
+                                        project=cls.project, user=cls.test_user)
+        cls.task2 = Task.objects.create(date=date(2021, 5, 20), time_worked=60, description="def",
+                                        project=cls.project, user=cls.test_user)
+
+    @classmethod
+    def tearDownClass(cls):
+        for elem in [cls.task1, cls.task2, cls.test_user, cls.project, cls.department, cls.company]:
+            elem.delete()
+
+    def test_rebuilds_task_day_totals(self):
+        call_command("rebuild_task_totals", batch_size=1, stdout=StringIO())
+        total = TaskDayTotal.objects.get(user=self.test_user, date=date(2021, 5, 20))
+        self.assertEqual((total.time_worked, total.task_count), (180, 2))
+
+    def test_verifies_task_day_totals(self):
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_totals", verify=True, stdout=StringIO())
+        call_command("rebuild_task_totals", stdout=StringIO())
+        out = StringIO()
+        call_command("rebuild_task_totals", verify=True, stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+    def test_rebuilds_only_empty_task_day_totals(self):
+        call_command("rebuild_task_totals", if_empty=True, stdout=StringIO())
+        self.assertEqual(TaskDayTotal.objects.get(user=self.test_user, date=date(2021, 5, 20)).time_worked, 180)
+        TaskDayTotal.objects.update(time_worked=1)
+        call_command("rebuild_task_totals", if_empty=True, stdout=StringIO())
+        self.assertEqual(TaskDayTotal.objects.get(user=self.test_user, date=date(2021, 5, 20)).time_worked, 1)
+
+    def test_decrements_do_not_go_below_zero(self):
+        TaskDayTotal.objects.create(user=self.test_user, date=date(2021, 5, 20), time_worked=60, task_count=2)
+        TaskDayTotal.objects.apply(self.test_user, date(2021, 5, 20), -120, -1)
+        total = TaskDayTotal.objects.get(user=self.test_user, date=date(2021, 5, 20))
+        self.assertEqual((total.time_worked, total.task_count), (0, 1))
+
+
+class GenerateDataCommandTestCase(TestCase):
+
+    def generate(self, **options):
+        call_command("generate_data", companies=2, departments=2, projects=3, users=4, tasks=1000, seed=5,
+                     batch_size=300, start=date(2021, 5, 1), end=date(2021, 5, 31), stdout=StringIO(), **options)
+        return sorted(Task.objects.filter(user__email__startswith="s5.").values_list(
+            "user__email", "date", "time_worked", "project__name", "description"))
+
+    def test_generates_requested_data(self):
+        tasks = self.generate()
+        self.assertEqual(len(tasks), 1000)
+        self.assertEqual(Company.objects.filter(name__startswith="s5 ").count(), 2)
+        self.assertEqual(User.objects.filter(email__startswith="s5.", role=2).count(), 4)
+        self.assertEqual(User.objects.filter(email__startswith="s5.", role=3).count(), 16)
+        self.assertTrue(all(time_worked % 15 == 0 and 15 <= time_worked <= 480 for _, _, time_worked, _, _ in tasks))
+        self.assertTrue(all(day.weekday() < 5 for _, day, _, _, _ in tasks))
+        for task in Task.objects.select_related("user__department")[:50]:
+            self.assertTrue(task.user.department.project.filter(id=task.project_id).exists())
+        self.assertEqual(TaskDayTotal.objects.aggregate(total=Sum("time_worked"))["total"],
+                         Task.objects.aggregate(total=Sum("time_worked"))["total"])
+
+    def test_default_period_does_not_depend_on_today(self):
+        call_command("generate_data", companies=1, departments=1, projects=2, users=2, tasks=50, seed=6,
+                     stdout=StringIO())
+        days = Task.objects.filter(user__email__startswith="s6.").values_list("date", flat=True)
+        self.assertTrue(all(date(2021, 1, 1) <= day <= date(2021, 12, 31) for day in days))
+
+    def test_is_deterministic(self):
+        first = self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+        Task.objects.filter(user__email__startswith="s5.").delete()
+        User.objects.filter(email__startswith="s5.").delete()
+        Department.objects.filter(name__startswith="s5 ").delete()
+        Project.objects.filter(name__startswith="s5 ").delete()
+        Company.objects.filter(name__startswith="s5 ").delete()
+        self.assertEqual(self.generate(), first)
@@ -45,3 +45,8 @@ class ModelsTestCase(TestCase):
 
     def test_checking_dunder_str_method_department_model(self):
         self.assertEqual(str(self.department), "abc")
+
+    def test_checking_indexes_task_model(self):
+        indexes = {index.name: index.fields for index in Task._meta.indexes}
+        self.assertEqual(indexes["task_user_date_idx"], ["user", "date"])
+        self.assertEqual(indexes["task_date_project_idx"], ["date", "project"])
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.utils import timezone
 from django.urls import reverse
-from user.models import User, Department, Company, Project, Task
+from user.models import User, Department, Company, Project, Task, TaskDayTotal
 from datetime import date
 
 
@@ -46,6 +46,19 @@ class ViewsTestCase(TestCase):
         self.assertEqual(resp.context["current_year"], today.year)
         self.assertEqual(resp.context["current_month"], today.month)
 
+    def test_check_hours_worked_calendar_index_view(self):
+        self.client.force_login(self.test_user1)
+        today = date.today()
+        self.client.post(reverse("create-task", args=[today.year, today.month, today.day]), data={
+            "project": [f"{self.project.id}"],
+            "time_worked": ["90"],
+            "description": ["add"],
+        })
+        resp = self.client.get(reverse("user-page"))
+        days = {day.num: day for week in resp.context["weeks"] for day in week if day is not None}
+        self.assertEqual((days[today.day].time_worked, days[today.day].task_count), (90, 1))
+        self.assertContains(resp, "1.5h / 1")
+
     def test_1_check_access_tasks_view(self):
         self.client.force_login(self.test_user1)
         resp = self.client.get(reverse("list-tasks", args=[2021, 5, 20]))
@@ -147,6 +160,23 @@ class ViewsTestCase(TestCase):
         })
         self.assertEqual(resp.status_code, 404)
 
+    def test_maintains_task_day_total_create_edit_delete_task_views(self):
+        self.client.force_login(self.test_user1)
+        data = {"project": [f"{self.project.id}"], "time_worked": ["140"], "description": ["add"]}
+        self.client.post(reverse("create-task", args=[2021, 5, 20]), data=data)
+        self.client.post(reverse("create-task", args=[2021, 5, 20]), data=data)
+        total = TaskDayTotal.objects.get(user=self.test_user1, date=date(2021, 5, 20))
+        self.assertEqual((total.time_worked, total.task_count), (280, 2))
+
+        task = Task.objects.filter(user=self.test_user1, date=date(2021, 5, 20)).first()
+        self.client.post(reverse("edit-task", args=[task.id]), data={**data, "time_worked": ["40"]})
+        total.refresh_from_db()
+        self.assertEqual((total.time_worked, total.task_count), (180, 2))
+
+        for task in Task.objects.filter(user=self.test_user1, date=date(2021, 5, 20)):
+            self.client.get(reverse("delete-task", args=[task.id]))
+        self.assertFalse(TaskDayTotal.objects.filter(user=self.test_user1, date=date(2021, 5, 20)).exists())
+
     def test_1_check_access_edit_task_view(self):
         self.client.force_login(self.test_user1)
         resp = self.client.get(reverse("edit-task", args=[self.task1.id]))
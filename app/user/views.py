@@ -4,11 +4,14 @@ from user.forms import ChangeDataUserForm, CalendarForm, ChangePasswordUserForm,
 from django.contrib import messages
 from django.contrib.auth.hashers import check_password
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from datetime import date
+from calendar import monthrange
 from user.calendar import get_all_weeks_month, years, months
-from user.models import Task
+from user.models import Task, TaskDayTotal
 from django.urls import reverse_lazy
 from main.views import decorator_adds_user_information_log
+from main.pagination import get_keyset_page, get_carried_fields
 
 
 def decorator_check_user(func):
@@ -60,7 +63,10 @@ def index(request):
     else:
         year, month = today.year, today.month
 
-    weeks = get_all_weeks_month(year, month)
+    totals = {day.day: (time_worked, task_count) for day, time_worked, task_count in TaskDayTotal.objects.filter(
+        user=request.user, date__range=(date(year, month, 1), date(year, month, monthrange(year, month)[1]))
+    ).values_list("date", "time_worked", "task_count")}
+    weeks = get_all_weeks_month(year, month, totals)
 
     return render(request, "user/main/index.html", context={
         "years": years,
@@ -81,7 +87,7 @@ def tasks(request, year, month, day):
     get_date = date(year, month, day)
     return render(request, "user/tasks/index.html", context={
         "date": get_date,
-        "tasks": Task.objects.filter(user__id=request.user.id, date=get_date),
+        "tasks": Task.objects.filter(user__id=request.user.id, date=get_date).select_related("project"),
     })
 
 
@@ -145,13 +151,15 @@ def create_task(request, year, month, day):
     if request.method == "POST":
         form = TaskForm(request.POST, user=request.user)
         if form.is_valid():
-            Task.objects.create(**{
-                "project": form.cleaned_data["project"],
-                "time_worked": form.cleaned_data["time_worked"],
-                "description": form.cleaned_data["description"],
-                "date": date(year, month, day),
-                "user": request.user,
-            })
+            with transaction.atomic():
+                task = Task.objects.create(**{
+                    "project": form.cleaned_data["project"],
+                    "time_worked": form.cleaned_data["time_worked"],
+                    "description": form.cleaned_data["description"],
+                    "date": date(year, month, day),
+                    "user": request.user,
+                })
+                TaskDayTotal.objects.apply(request.user, task.date, task.time_worked, 1)
             return redirect(tasks, year, month, day)
         else:
             messages.error(request, "Invalid data")
@@ -172,18 +180,21 @@ def edit_task(request, task_id):
     if request.method == "POST":
         form = TaskForm(request.POST, user=request.user)
         if form.is_valid():
-            Task.objects.filter(id=task_id, user=request.user).update(**{
-                "project": form.cleaned_data["project"],
-                "time_worked": form.cleaned_data["time_worked"],
-                "description": form.cleaned_data["description"],
-            })
-            task = Task.objects.get(id=task_id, user=request.user)
+            with transaction.atomic():
+                task = Task.objects.select_for_update().get(id=task_id, user=request.user)
+                Task.objects.filter(id=task_id, user=request.user).update(**{
+                    "project": form.cleaned_data["project"],
+                    "time_worked": form.cleaned_data["time_worked"],
+                    "description": form.cleaned_data["description"],
+                })
+                TaskDayTotal.objects.apply(request.user, task.date,
+                                           form.cleaned_data["time_worked"] - task.time_worked, 0)
             return redirect(tasks, task.date.year, task.date.month, task.date.day)
         else:
             messages.error(request, "Invalid data")
-    task = Task.objects.get(id=task_id)
+    task = Task.objects.get(id=task_id, user=request.user)
     return render(request, "form.html", context={
-        "form": TaskForm(user=request.user, instance=Task.objects.get(id=task_id, user=request.user)),
+        "form": TaskForm(user=request.user, instance=task),
         "title": "Edit task",
         "url_back": reverse_lazy('list-tasks', args=[task.date.year, task.date.month, task.date.day]),
         "button_name": "Edit",
@@ -196,9 +207,11 @@ def edit_task(request, task_id):
 @decorator_handles_task_DoesNotExist
 def delete_task(request, task_id):
     """Удаление задания"""
-    task = Task.objects.get(id=task_id, user=request.user)
-    year, month, day = task.date.year, task.date.month, task.date.day
-    task.delete()
+    with transaction.atomic():
+        task = Task.objects.select_for_update().get(id=task_id, user=request.user)
+        year, month, day = task.date.year, task.date.month, task.date.day
+        task.delete()
+        TaskDayTotal.objects.apply(request.user, task.date, -task.time_worked, -1)
     return redirect(tasks, year, month, day)
 
 
@@ -210,9 +223,14 @@ def select_tasks(request):
     if request.method == "POST":
         form = SelectionForm(request.POST)
         if form.is_valid():
+            page = get_keyset_page(Task.objects.filter(user=request.user, date__range=(
+                form.cleaned_data["start_date"], form.cleaned_data["end_date"])).select_related("project"),
+                ("date", "id"), after=request.POST.get("after"), before=request.POST.get("before"))
             return render(request, "user/tasks/list_tasks.html", context={
-                "tasks": Task.objects.filter(user=request.user).exclude(
-                    date__gt=form.cleaned_data["end_date"]).exclude(date__lt=form.cleaned_data["start_date"])
+                "tasks": page,
+                "page": page,
+                "page_method": "post",
+                "page_fields": get_carried_fields(request.POST),
             })
         else:
             messages.error(request, "Invalid data")